@@ -1,36 +1,40 @@
 from fastapi import APIRouter, HTTPException, Depends
 
-from appointment.core.db import TokenData, get_current_user, get_db
+from appointment.core.db import TokenData, get_async_db, get_current_user
 from appointment.dto import AppointmentCreate
-from appointment.service.appointment_service import book_appointment_logic, get_all_appointment, get_appointment_by_id
-from sqlalchemy.orm import Session
+from appointment.service.appointment_service import AppointmentConflictError, AppointmentNotFoundError, book_appointment_logic_async, get_all_appointment_async, get_appointment_by_id_async
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 
 # Retrieve all appointments
 # @router.get("/")
-# def get_appointments(db: Session = Depends(get_db)):
-#     return get_all_appointment(db)
+# async def get_appointments(db: AsyncSession = Depends(get_async_db)):
+#     return await get_all_appointment_async(db)
 
 
 # Retrieve an appointment by ID
 # @router.get("/{appointment_id}")
-# def get_appointment(appointment_id: int, db: Session = Depends(get_db)):
-#     return get_appointment_by_id(appointment_id)
+# async def get_appointment(appointment_id: int, db: AsyncSession = Depends(get_async_db)):
+#     return await get_appointment_by_id_async(appointment_id, db)
 
 
 # Book an appointment
 @router.post("/book-appointment")
-def book_appointment(appointment: AppointmentCreate, user: TokenData = Depends(get_current_user), db: Session = Depends(get_db)):
+async def book_appointment(appointment: AppointmentCreate, user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     # error = ""
     try:
-        new_appointment = book_appointment_logic(appointment, db)
+        new_appointment = await book_appointment_logic_async(appointment, db)
 
         # ai_response = chat_with_ollama(f"Confirm the appointment for {appointment.patient_name} with {appointment.doctor_name} on {appointment.appointment_date}.")
 
         return {"message": "sucess", "appointment_id": new_appointment.id}
         # return {"message": ai_response, "appointment_id": new_appointment.id}
+    except AppointmentConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AppointmentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
 
         # @See https://chatgpt.com/c/67c872cd-bdf0-8008-b014-9f20e84a6c5c for error handling
@@ -3,10 +3,10 @@ from fastapi import APIRouter, FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError
 import redis
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from appointment.core import jwt
-from appointment.core.db import get_db
+from appointment.core.db import get_async_db
 from appointment.core.jwt import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
 from appointment.dto import Token, UserPatientCreate
 from appointment.models import User
@@ -20,8 +20,8 @@ router = APIRouter()
 
 # login
 @router.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = user_repository.verify_user(db, form_data)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await user_repository.verify_user_async(db, form_data)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,15 +36,15 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
 
 # sign up
 @router.post("/users/")
-def create_user(user: UserPatientCreate, db: Session = Depends(get_db)):
-    db_user = user_service.get_user_username_phone_logic(db, username=user.username)
+async def create_user(user: UserPatientCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await user_service.get_user_username_phone_logic_async(db, username=user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    return user_service.create_user_logic(db=db, user=user)
+    return await user_service.create_user_logic_async(db=db, user=user)
 
 
 # @router.post("/logout")
-# async def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# async def logout(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
 #     try:
 #         payload = jwt.decode_token(token)
 #         exp = payload.get("exp")
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from appointment.core.db import TokenData, get_async_db, get_current_user
+from appointment.service.bulk_service import (
+    import_appointments_logic_async,
+    import_doctor_patients_logic_async,
+    import_doctors_logic_async,
+    import_patients_logic_async,
+    iter_json_rows,
+    iter_ndjson_rows,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter()
+
+
+async def request_rows(request: Request):
+    """Rows of a request body: a JSON array, or NDJSON (one object per line) read as it streams in."""
+    if "ndjson" in request.headers.get("content-type", ""):
+        return iter_ndjson_rows(request.stream())
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    return iter_json_rows(rows)
+
+
+async def run_import(import_logic, request: Request, db: AsyncSession):
+    rows = await request_rows(request)
+    try:
+        return await import_logic(rows, db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Import doctors: [{"name": ..., "phone": ...}, ...]
+@router.post("/doctors")
+async def import_doctors(request: Request, user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_import(import_doctors_logic_async, request, db)
+
+
+# Import patients: [{"name": ..., "phone": ...}, ...]
+@router.post("/patients")
+async def import_patients(request: Request, user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_import(import_patients_logic_async, request, db)
+
+
+# Import doctor-patient links: [{"doctor_id": ..., "patient_id": ...}, ...]
+@router.post("/doctor-patient")
+async def import_doctor_patients(request: Request, user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_import(import_doctor_patients_logic_async, request, db)
+
+
+# Import appointments: [{"doctor_id": ..., "patient_id": ..., "appointment_date": ..., "duration_minutes": 30}, ...]
+@router.post("/appointments")
+async def import_appointments(request: Request, user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_import(import_appointments_logic_async, request, db)
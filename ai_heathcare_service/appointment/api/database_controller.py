@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from appointment.core.db import get_pool_stats
+
+router = APIRouter()
+
+
+# Connection pool usage: checkouts, time spent waiting for a connection, timeouts
+@router.get("/pool-stats")
+async def pool_stats():
+    return get_pool_stats()
@@ -1,24 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends
 
-from appointment.core.db import get_db
+from appointment.core.db import get_async_db
 from appointment.dto import PatientDoctorCreate
-from appointment.service.doctor_patient_service import create_patient_doctor_logic, get_all_patient_doctor_logic
-from sqlalchemy.orm import Session
+from appointment.service.doctor_patient_service import create_patient_doctor_logic_async, get_all_patient_doctor_logic_async
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 
 # Retrieve all appointments
 @router.get("/")
-def get_patients_doctors():
-    return get_all_patient_doctor_logic()
+async def get_patients_doctors(db: AsyncSession = Depends(get_async_db)):
+    return await get_all_patient_doctor_logic_async(db)
 
 
 # @router.post("/create")
-# def create_patient_doctor(patient_doctor: PatientDoctorCreate):
+# async def create_patient_doctor(patient_doctor: PatientDoctorCreate, db: AsyncSession = Depends(get_async_db)):
 
 #     try:
-#         new_patient_doctor = create_patient_doctor_logic(patient_doctor)
+#         new_patient_doctor = await create_patient_doctor_logic_async(patient_doctor, db)
 
 #         return {"message": "success", "new_patient_doctor": new_patient_doctor}
 #     except Exception as e:
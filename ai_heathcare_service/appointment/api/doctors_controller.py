@@ -1,18 +1,66 @@
+import datetime
+
 from fastapi import APIRouter, Depends, HTTPException
 
-from appointment.core.db import get_db
-from appointment.dto import DoctorCreate
-from appointment.service.doctor_service import get_all_doctors, create_doctor_logic
-from sqlalchemy.orm import Session
+from appointment.core.db import TokenData, get_async_db, get_current_user
+from appointment.dto import DoctorCreate, DoctorScheduleCreate
+from appointment.service.doctor_service import get_all_doctors_async, create_doctor_logic_async
+from appointment.service.schedule_service import (
+    create_schedule_logic_async,
+    get_free_slots_logic_async,
+    get_schedules_logic_async,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
-# db: Session = Depends(get_db)
+# Longest date range of a free-slot search
+MAX_SLOT_SEARCH_DAYS = 31
+
+
+def check_date_range(start: datetime.date, end: datetime.date):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_SLOT_SEARCH_DAYS:
+        raise HTTPException(status_code=400, detail=f"Search at most {MAX_SLOT_SEARCH_DAYS} days at a time")
+
+# db: AsyncSession = Depends(get_async_db)
 
 # Retrieve all appointments
 @router.get("/")
-def get_doctors(db: Session = Depends(get_db)):
-    return get_all_doctors(db)
+async def get_doctors(db: AsyncSession = Depends(get_async_db)):
+    return await get_all_doctors_async(db)
+
+
+# Free slots of every doctor between two dates (inclusive), e.g. a week view
+@router.get("/free-slots")
+async def get_all_free_slots(start: datetime.date, end: datetime.date, db: AsyncSession = Depends(get_async_db)):
+    check_date_range(start, end)
+    return await get_free_slots_logic_async(start, end, db)
+
+
+# Free slots of one doctor between two dates (inclusive)
+@router.get("/{doctor_id}/free-slots")
+async def get_free_slots(doctor_id: int, start: datetime.date, end: datetime.date, db: AsyncSession = Depends(get_async_db)):
+    check_date_range(start, end)
+    free_slots = await get_free_slots_logic_async(start, end, db, doctor_ids=[doctor_id])
+    return free_slots.get(doctor_id, [])
+
+
+# Weekly working hours of a doctor
+@router.get("/{doctor_id}/schedules")
+async def get_schedules(doctor_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_schedules_logic_async(doctor_id, db)
+
+
+# Add working hours for one weekday
+@router.post("/{doctor_id}/schedules")
+async def create_schedule(doctor_id: int, schedule: DoctorScheduleCreate, user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        new_schedule = await create_schedule_logic_async(doctor_id, schedule, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": "success", "schedule_id": new_schedule.id}
 
 
 # Retrieve an appointment by ID
@@ -23,10 +71,10 @@ def get_doctors(db: Session = Depends(get_db)):
 
 # Book an appointment
 # @router.post("/create")
-# def create_doctor(doctor: DoctorCreate, db: Session = Depends(get_db)):
+# async def create_doctor(doctor: DoctorCreate, db: AsyncSession = Depends(get_async_db)):
 
 #     try:
-#         new_doctor = create_doctor_logic(doctor, db)
+#         new_doctor = await create_doctor_logic_async(doctor, db)
 
 #         return {"message": "success", "doctor_id": new_doctor.id}
 #     except Exception as e:
@@ -1,24 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends
 
-from appointment.core.db import get_db
+from appointment.core.db import get_async_db
 from appointment.dto import PatientCreate
-from appointment.service.patient_service import create_patient_logic, get_all_patients
-from sqlalchemy.orm import Session
+from appointment.service.patient_service import create_patient_logic_async, get_all_patients_async
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 
 # Retrieve all appointments
 @router.get("/")
-def get_patients(db: Session = Depends(get_db)):
-    return get_all_patients(db)
+async def get_patients(db: AsyncSession = Depends(get_async_db)):
+    return await get_all_patients_async(db)
 
 
 # @router.post("/create")
-# def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
+# async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_async_db)):
 
 #     try:
-#         new_patient = create_patient_logic(patient, db)
+#         new_patient = await create_patient_logic_async(patient, db)
 
 #         return {"message": "sucess", "new_patient": new_patient.id}
 #     except Exception as e:
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Checkout, wait and timeout counters of one engine's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # Checkouts that took over 1 ms: waited for a returned, new or pre-pinged connection
+        self.slow_checkouts = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if seconds > 0.001:
+                self.slow_checkouts += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return stats
+
+
+def timed_pool_class(base: type, stats: PoolStats) -> type:
+    """A subclass of a queue pool that records how long each checkout waits.
+
+    The stats live on the class, so they survive the pool being recreated by
+    ``engine.dispose()``.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except exc.TimeoutError:
+            stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect, "stats": stats})
+
+
+def listen_pool_events(engine, stats: PoolStats):
+    """Count connects, checkouts, checkins and invalidations of an engine's pool."""
+    event.listen(engine, "connect", lambda *args: stats.count("connects"))
+    event.listen(engine, "checkout", lambda *args: stats.count("checkouts"))
+    event.listen(engine, "checkin", lambda *args: stats.count("checkins"))
+    event.listen(engine, "invalidate", lambda *args: stats.count("invalidations"))
@@ -1,6 +1,9 @@
 import datetime
 from pydantic import BaseModel, Field
 
+# Longest bookable appointment; bounds the range scanned by overlap checks
+MAX_APPOINTMENT_MINUTES = 8 * 60
+
 
 # Define request schema
 class AppointmentCreate(BaseModel):
@@ -14,6 +17,7 @@ class AppointmentCreate(BaseModel):
         default_factory=lambda: datetime.datetime.now(datetime.UTC)
         + datetime.timedelta(hours=7)
     )
+    duration_minutes: int = Field(default=30, gt=0, le=MAX_APPOINTMENT_MINUTES)
 
 
 class DoctorCreate(BaseModel):
@@ -26,6 +30,21 @@ class PatientCreate(BaseModel):
     phone: str
 
 
+class DoctorScheduleCreate(BaseModel):
+    weekday: int = Field(ge=0, le=6)  # 0 = Monday ... 6 = Sunday
+    start_time: datetime.time
+    end_time: datetime.time
+    slot_minutes: int = Field(default=30, gt=0, le=MAX_APPOINTMENT_MINUTES)
+
+
+# One row of a bulk appointment import (history of a branch), by database ids
+class AppointmentImport(BaseModel):
+    doctor_id: int
+    patient_id: int
+    appointment_date: datetime.datetime
+    duration_minutes: int = Field(default=30, gt=0, le=MAX_APPOINTMENT_MINUTES)
+
+
 class PatientDoctorCreate(BaseModel):
     doctor_id: int
     patient_id: int
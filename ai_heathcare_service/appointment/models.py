@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Column, Engine, ForeignKey, Integer, String, DateTime, Table
+from sqlalchemy import Column, Engine, ForeignKey, Index, Integer, String, DateTime, Table, Time
 from sqlalchemy.orm import relationship
 
 from appointment.core.db import Base, engine
@@ -42,6 +42,7 @@ class Doctor(Base):
     profile = relationship(
         "DoctorProfile", back_populates="doctor", uselist=False
     )  # One-to-One
+    schedules = relationship("DoctorSchedule", back_populates="doctor")  # One-to-Many
 
 
 # One-to-One: DoctorProfile (Extra details for Doctor)
@@ -58,9 +59,28 @@ class DoctorProfile(Base):
     #
     doctor = relationship("Doctor", back_populates="profile")
 
+# One-to-Many: DoctorSchedule (Weekly working hours of a Doctor, split into bookable slots)
+class DoctorSchedule(Base):
+    __tablename__ = "doctor_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id"), nullable=False, index=True)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday ... 6 = Sunday
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    slot_minutes = Column(Integer, nullable=False, default=30)
+
+    doctor = relationship("Doctor", back_populates="schedules")
+
+
 # One-to-Many: Appointment (Belongs to one Patient & one Doctor)
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Overlap checks and free-slot searches are range scans of one doctor's appointments.
+        # Unique, so the database itself rejects a second booking of the same start time.
+        Index("ix_appointments_doctor_id_appointment_date", "doctor_id", "appointment_date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # patient_name = Column(String, index=True)
@@ -75,6 +95,7 @@ class Appointment(Base):
 
     # appointment_date = Column(DateTime, default=datetime.datetime.utcnow)
     appointment_date = Column(DateTime)
+    duration_minutes = Column(Integer, nullable=False, default=30, server_default="30")
 
 
 class User(Base):
@@ -1,8 +1,11 @@
 import datetime
 from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from appointment.core.db import get_db
+from appointment.dto import MAX_APPOINTMENT_MINUTES
 from appointment.models import Appointment
 
 # db: Session = Depends(get_db)
@@ -16,19 +19,39 @@ def get_all_appointments(db: Session):
     return db.query(Appointment).all()
 
 
-def check_avialable_date(appointment_date: datetime, db: Session):
-    appointments = (
-        db.query(Appointment)
-        .filter(Appointment.appointment_date == appointment_date)
-        .all()
+def _overlapping_query(doctor_ids, start: datetime.datetime, end: datetime.datetime):
+    # A range scan of the (doctor_id, appointment_date) index: appointments that start
+    # before `end` and late enough that they could still be running at `start`
+    return (
+        select(Appointment)
+        .where(
+            Appointment.doctor_id.in_(doctor_ids),
+            Appointment.appointment_date < end,
+            Appointment.appointment_date > start - datetime.timedelta(minutes=MAX_APPOINTMENT_MINUTES),
+        )
+        .order_by(Appointment.doctor_id, Appointment.appointment_date)
     )
-    return appointments  # Returns a list of matching appointments
 
 
-def book_appointment_data(doctor_id: int, patient_id: int, appointment_date: datetime, db: Session):
+def _still_running(appointments, start: datetime.datetime):
+    # Drop the ones that ended by `start`
+    return [
+        a for a in appointments
+        if a.appointment_date + datetime.timedelta(minutes=a.duration_minutes) > start
+    ]
+
+
+def get_doctor_appointments_between(doctor_ids, start: datetime.datetime, end: datetime.datetime, db: Session):
+    """Appointments of the doctors overlapping [start, end), ordered by doctor and start."""
+    appointments = db.execute(_overlapping_query(doctor_ids, start, end)).scalars().all()
+    return _still_running(appointments, start)
+
+
+def book_appointment_data(doctor_id: int, patient_id: int, appointment_date: datetime, db: Session, duration_minutes: int = 30):
 
     new_appointment = Appointment(
-        patient_id=patient_id, doctor_id=doctor_id, appointment_date=appointment_date
+        patient_id=patient_id, doctor_id=doctor_id, appointment_date=appointment_date,
+        duration_minutes=duration_minutes
     )
 
     db.add(new_appointment)
@@ -36,3 +59,38 @@ def book_appointment_data(doctor_id: int, patient_id: int, appointment_date: dat
     db.refresh(new_appointment)
 
     return new_appointment
+
+
+async def get_appointment_id_async(appointment_id: int, db: AsyncSession):
+    return await db.get(Appointment, appointment_id)
+
+
+async def get_all_appointments_async(db: AsyncSession):
+    result = await db.execute(select(Appointment))
+    return result.scalars().all()
+
+
+async def get_overlapping_appointments_async(doctor_id: int, start: datetime.datetime, end: datetime.datetime, db: AsyncSession):
+    """The doctor's appointments that overlap [start, end)."""
+    result = await db.execute(_overlapping_query([doctor_id], start, end))
+    return _still_running(result.scalars().all(), start)
+
+
+async def get_doctor_appointments_between_async(doctor_ids, start: datetime.datetime, end: datetime.datetime, db: AsyncSession):
+    """Appointments of the doctors overlapping [start, end), ordered by doctor and start."""
+    result = await db.execute(_overlapping_query(doctor_ids, start, end))
+    return _still_running(result.scalars().all(), start)
+
+
+async def book_appointment_data_async(doctor_id: int, patient_id: int, appointment_date: datetime, db: AsyncSession, duration_minutes: int = 30):
+
+    new_appointment = Appointment(
+        patient_id=patient_id, doctor_id=doctor_id, appointment_date=appointment_date,
+        duration_minutes=duration_minutes
+    )
+
+    db.add(new_appointment)
+    await db.commit()
+    await db.refresh(new_appointment)
+
+    return new_appointment
@@ -0,0 +1,41 @@
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _insert_statement(table: Table):
+    stmt = insert(table)
+    if "id" in table.c:
+        stmt = stmt.returning(table.c.id, sort_by_parameter_order=True)
+    return stmt
+
+
+async def insert_rows_data_async(table: Table, rows, db: AsyncSession):
+    """Insert rows (column -> value dicts) with one executemany.
+
+    Returns (ids, errors): the new id of each row (None for tables without an id and
+    for failed rows) and {row position: error message}. If the batch fails, it is
+    rolled back to a savepoint and the rows are inserted one by one, each in its own
+    savepoint, so one bad row only loses itself.
+    """
+    stmt = _insert_statement(table)
+    has_id = "id" in table.c
+    try:
+        async with db.begin_nested():
+            result = await db.execute(stmt, rows)
+            ids = list(result.scalars().all()) if has_id else [None] * len(rows)
+        return ids, {}
+    except DBAPIError:
+        pass
+
+    ids = []
+    errors = {}
+    for position, row in enumerate(rows):
+        try:
+            async with db.begin_nested():
+                result = await db.execute(stmt, [row])
+                ids.append(result.scalar_one() if has_id else None)
+        except DBAPIError as e:
+            ids.append(None)
+            errors[position] = str(e.orig)
+    return ids, errors
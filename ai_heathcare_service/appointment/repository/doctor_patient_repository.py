@@ -1,49 +1,93 @@
 from sqlalchemy import Engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from sqlalchemy.orm import Session
 from appointment.dto import PatientDoctorCreate
 from appointment.models import doctor_patient_association
 
-from appointment.core.db import get_db, engine
+from appointment.core.db import get_db
 
+# Every function runs on the caller's session, so a request uses one connection
+# and its checks and writes share one transaction
 # db: Session = Depends(get_db)
 
 
-def check_patient_doctor_data(doctor_id: int, patient_id: int):
-    with Session(engine) as session:
-        stmt = select(doctor_patient_association).where(
-            doctor_patient_association.c.doctor_id == doctor_id,
-            doctor_patient_association.c.patient_id == patient_id,
-        )
+def check_patient_doctor_data(doctor_id: int, patient_id: int, db: Session):
+    stmt = select(doctor_patient_association).where(
+        doctor_patient_association.c.doctor_id == doctor_id,
+        doctor_patient_association.c.patient_id == patient_id,
+    )
 
-        return session.execute(stmt).fetchone()  # Fetch one record
+    return db.execute(stmt).fetchone()  # Fetch one record
 
 
-def create_patient_doctor_data(patientDoctor: PatientDoctorCreate):
-    with Session(engine) as session:
-        stmt = (
-            insert(doctor_patient_association)
-            .values(
-                doctor_id=patientDoctor.doctor_id, patient_id=patientDoctor.patient_id
-            )
-            .returning(
-                doctor_patient_association.c.doctor_id,
-                doctor_patient_association.c.patient_id,
-            )
+def create_patient_doctor_data(patientDoctor: PatientDoctorCreate, db: Session):
+    stmt = (
+        insert(doctor_patient_association)
+        .values(
+            doctor_id=patientDoctor.doctor_id, patient_id=patientDoctor.patient_id
+        )
+        .returning(
+            doctor_patient_association.c.doctor_id,
+            doctor_patient_association.c.patient_id,
         )
+    )
+
+    result = db.execute(stmt).fetchone()
+    db.commit()
+
+    return {"doctor_id": result.doctor_id, "patient_id": result.patient_id}
+
+
+def get_all_patient_doctor_data(db: Session):
+    stmt = select(doctor_patient_association)
+    result = db.execute(stmt).fetchall()  # Fetch all records
+
+    # Convert result into a list of dictionaries
+    return [
+        {"doctor_id": row.doctor_id, "patient_id": row.patient_id} for row in result
+    ]
 
-        result = session.execute(stmt).fetchone()
-        session.commit()
 
-        return {"doctor_id": result.doctor_id, "patient_id": result.patient_id}
+async def check_patient_doctor_data_async(doctor_id: int, patient_id: int, db: AsyncSession):
+    stmt = select(doctor_patient_association).where(
+        doctor_patient_association.c.doctor_id == doctor_id,
+        doctor_patient_association.c.patient_id == patient_id,
+    )
+    result = await db.execute(stmt)
+    return result.fetchone()
+
+
+async def get_patient_doctor_pairs_data_async(doctor_ids, patient_ids, db: AsyncSession):
+    """The (doctor_id, patient_id) associations among the given doctors and patients."""
+    stmt = select(doctor_patient_association.c.doctor_id, doctor_patient_association.c.patient_id).where(
+        doctor_patient_association.c.doctor_id.in_(doctor_ids),
+        doctor_patient_association.c.patient_id.in_(patient_ids),
+    )
+    result = await db.execute(stmt)
+    return {(row.doctor_id, row.patient_id) for row in result.fetchall()}
+
+
+async def create_patient_doctor_data_async(patientDoctor: PatientDoctorCreate, db: AsyncSession):
+    stmt = (
+        insert(doctor_patient_association)
+        .values(
+            doctor_id=patientDoctor.doctor_id, patient_id=patientDoctor.patient_id
+        )
+        .returning(
+            doctor_patient_association.c.doctor_id,
+            doctor_patient_association.c.patient_id,
+        )
+    )
+
+    result = (await db.execute(stmt)).fetchone()
+    await db.commit()
 
+    return {"doctor_id": result.doctor_id, "patient_id": result.patient_id}
 
-def get_all_patient_doctor_data():
-    with Session(engine) as session:
-        stmt = select(doctor_patient_association)
-        result = session.execute(stmt).fetchall()  # Fetch all records
 
-        # Convert result into a list of dictionaries
-        return [
-            {"doctor_id": row.doctor_id, "patient_id": row.patient_id} for row in result
-        ]
+async def get_all_patient_doctor_data_async(db: AsyncSession):
+    result = await db.execute(select(doctor_patient_association))
+    return [
+        {"doctor_id": row.doctor_id, "patient_id": row.patient_id} for row in result.fetchall()
+    ]
@@ -1,4 +1,5 @@
-from sqlalchemy import func
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -12,6 +13,14 @@ from appointment.models import Doctor
 def get_all_doctors_data(db: Session):
     return db.query(Doctor).all()
 
+def _lock_doctor_statement(doctor_id: int, dialect_name: str):
+    # Lock held until the transaction ends, so bookings of one doctor run one at a time.
+    # SQLite has no row locks: a no-op write takes its database write lock instead,
+    # which later bookings wait for rather than failing on a stale read.
+    if dialect_name == "sqlite":
+        return update(Doctor).where(Doctor.id == doctor_id).values(id=Doctor.id)
+    return select(Doctor.id).where(Doctor.id == doctor_id).with_for_update()
+
 def get_doctor_name_phone_data(name: str, phone: str, db: Session):
     return db.query(Doctor).filter(func.lower(Doctor.name) == name.lower(), Doctor.phone == phone).first()
 
@@ -22,4 +31,32 @@ def create_doctor_data(doctor: DoctorCreate, db: Session):
     db.commit()
     db.refresh(new_doctor)
     
-    return new_doctor
\ No newline at end of file
+    return new_doctor
+
+
+async def get_all_doctors_data_async(db: AsyncSession):
+    result = await db.execute(select(Doctor))
+    return result.scalars().all()
+
+async def lock_doctor_data_async(doctor_id: int, db: AsyncSession):
+    await db.execute(_lock_doctor_statement(doctor_id, db.get_bind().dialect.name))
+
+async def get_existing_doctor_ids_data_async(doctor_ids, db: AsyncSession):
+    """The ids among doctor_ids that belong to a doctor."""
+    result = await db.execute(select(Doctor.id).where(Doctor.id.in_(doctor_ids)))
+    return set(result.scalars().all())
+
+async def get_doctor_name_phone_data_async(name: str, phone: str, db: AsyncSession):
+    result = await db.execute(
+        select(Doctor).where(func.lower(Doctor.name) == name.lower(), Doctor.phone == phone)
+    )
+    return result.scalars().first()
+
+async def create_doctor_data_async(doctor: DoctorCreate, db: AsyncSession):
+    new_doctor = Doctor(name=doctor.name,phone=doctor.phone)
+
+    db.add(new_doctor)
+    await db.commit()
+    await db.refresh(new_doctor)
+
+    return new_doctor
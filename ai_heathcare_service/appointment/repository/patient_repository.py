@@ -1,4 +1,5 @@
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -21,4 +22,29 @@ def create_patient_data(patient: PatientCreate, db: Session):
     db.commit()
     db.refresh(new_patient)
     
-    return new_patient
\ No newline at end of file
+    return new_patient
+
+
+async def get_patient_name_phone_data_async(name: str, phone: str, db: AsyncSession):
+    result = await db.execute(
+        select(Patient).where(func.lower(Patient.name) == name.lower(), Patient.phone == phone)
+    )
+    return result.scalars().first()
+
+async def get_existing_patient_ids_data_async(patient_ids, db: AsyncSession):
+    """The ids among patient_ids that belong to a patient."""
+    result = await db.execute(select(Patient.id).where(Patient.id.in_(patient_ids)))
+    return set(result.scalars().all())
+
+async def get_all_patients_data_async(db: AsyncSession):
+    result = await db.execute(select(Patient))
+    return result.scalars().all()
+
+async def create_patient_data_async(patient: PatientCreate, db: AsyncSession):
+    new_patient = Patient(name=patient.name,phone=patient.phone)
+
+    db.add(new_patient)
+    await db.commit()
+    await db.refresh(new_patient)
+
+    return new_patient
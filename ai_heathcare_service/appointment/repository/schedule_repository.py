@@ -0,0 +1,42 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from appointment.dto import DoctorScheduleCreate
+from appointment.models import DoctorSchedule
+
+
+def _schedules_query(doctor_ids=None):
+    stmt = select(DoctorSchedule).order_by(DoctorSchedule.doctor_id, DoctorSchedule.weekday, DoctorSchedule.start_time)
+    if doctor_ids is not None:
+        stmt = stmt.where(DoctorSchedule.doctor_id.in_(doctor_ids))
+    return stmt
+
+
+def get_schedules_data(db: Session, doctor_ids=None):
+    return db.execute(_schedules_query(doctor_ids)).scalars().all()
+
+
+def create_schedule_data(doctor_id: int, schedule: DoctorScheduleCreate, db: Session):
+    new_schedule = DoctorSchedule(doctor_id=doctor_id, **schedule.model_dump())
+
+    db.add(new_schedule)
+    db.commit()
+    db.refresh(new_schedule)
+
+    return new_schedule
+
+
+async def get_schedules_data_async(db: AsyncSession, doctor_ids=None):
+    result = await db.execute(_schedules_query(doctor_ids))
+    return result.scalars().all()
+
+
+async def create_schedule_data_async(doctor_id: int, schedule: DoctorScheduleCreate, db: AsyncSession):
+    new_schedule = DoctorSchedule(doctor_id=doctor_id, **schedule.model_dump())
+
+    db.add(new_schedule)
+    await db.commit()
+    await db.refresh(new_schedule)
+
+    return new_schedule
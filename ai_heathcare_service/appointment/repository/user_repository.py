@@ -1,5 +1,8 @@
 from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from appointment.core.jwt import get_password_hash, verify_password
@@ -31,4 +34,31 @@ def verify_user(db: Session, form_data: OAuth2PasswordRequestForm = Depends()):
         return False
     if not verify_password(form_data.password, user.hashed_password):
         return False
-    return user
\ No newline at end of file
+    return user
+
+
+async def get_user_by_username_phone_model_async(db: AsyncSession, username: str):
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+async def create_user_with_patient_model_async(db: AsyncSession, user: UserPatientCreate):
+    # bcrypt is slow on purpose, keep it off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
+    db_user = User(username=user.username, hashed_password=hashed_password)
+    db.add(db_user)
+    await db.flush()
+
+    db_patient = Patient(name=user.name, phone=user.phone_number, user_id=db_user.id)
+    db.add(db_patient)
+    await db.commit()
+    await db.refresh(db_user)
+    await db.refresh(db_patient)
+    return db_user, db_patient
+
+async def verify_user_async(db: AsyncSession, form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await get_user_by_username_phone_model_async(db, form_data.username)
+    if not user:
+        return False
+    if not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
+        return False
+    return user
@@ -1,15 +1,55 @@
+import asyncio
+import datetime
+import os
+import random
+
 from appointment.dto import AppointmentCreate
 from appointment.repository.appointment_repository import (
-    book_appointment_data,
-    check_avialable_date,
+    book_appointment_data_async,
     get_all_appointments,
+    get_all_appointments_async,
     get_appointment_id,
+    get_appointment_id_async,
+    get_overlapping_appointments_async,
 )
-from appointment.repository.doctors_repository import get_doctor_name_phone_data
-from appointment.repository.patient_repository import get_patient_name_phone_data
-from appointment.service.doctor_patient_service import check_patient_doctor_logic
+from appointment.repository.doctors_repository import get_doctor_name_phone_data_async, lock_doctor_data_async
+from appointment.repository.patient_repository import get_patient_name_phone_data_async
+from appointment.service.doctor_patient_service import check_patient_doctor_logic_async
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+# Attempts of a booking transaction that hit a serialization failure, deadlock or
+# locked SQLite database, with exponential backoff (plus jitter) between them
+BOOKING_MAX_ATTEMPTS = int(os.getenv("BOOKING_MAX_ATTEMPTS", "5"))
+BOOKING_RETRY_BASE_SECONDS = float(os.getenv("BOOKING_RETRY_BASE_SECONDS", "0.01"))
+
+# PostgreSQL serialization_failure and deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+class AppointmentConflictError(Exception):
+    """The doctor already has an appointment overlapping the requested time."""
+
+
+class AppointmentNotFoundError(Exception):
+    """The requested doctor or patient does not exist."""
+
+
+def _is_retryable(error: DBAPIError) -> bool:
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return code in RETRYABLE_SQLSTATES or "database is locked" in str(error.orig)
+
+
+def _retry_delay(attempt: int) -> float:
+    return BOOKING_RETRY_BASE_SECONDS * (2 ** attempt) * (0.5 + random.random())
+
+
+def _appointment_interval(appointment: AppointmentCreate):
+    """[start, end) of a requested appointment, as the naive wall-clock times stored in the database."""
+    start = appointment.appointment_date.replace(tzinfo=None)
+    return start, start + datetime.timedelta(minutes=appointment.duration_minutes)
+
 
 def get_appointment_by_id(appointment_id: int, db: Session):
     return get_appointment_id(appointment_id, db)
@@ -19,27 +59,45 @@ def get_all_appointment(db: Session):
     return get_all_appointments(db)
 
 
-def book_appointment_logic(appointment: AppointmentCreate, db: Session):
-    
-    # doctor_name_lower = appointment.doctor_name.lower()
-    # patient_name_lower = appointment.pa
-    patient_res = get_patient_name_phone_data(appointment.patient_name, appointment.patient_phone, db)
-    
-    doctor_res = get_doctor_name_phone_data(appointment.doctor_name, appointment.doctor_phone, db)
-    # print("hello 1")
-    if not doctor_res:
-        raise Exception("Sorry, the doctor is not exist")
-    
-    patient_doctor_assoc = check_patient_doctor_logic(
-        doctor_res.id, patient_res.id
-    )
+async def get_appointment_by_id_async(appointment_id: int, db: AsyncSession):
+    return await get_appointment_id_async(appointment_id, db)
+
 
-    if not patient_doctor_assoc:
-        raise Exception("Sorry, the doctor is not for the patient")
+async def get_all_appointment_async(db: AsyncSession):
+    return await get_all_appointments_async(db)
 
-    check_available_date_data = check_avialable_date(appointment.appointment_date, db)
 
-    if check_available_date_data:
-        raise Exception("Sorry, the doctor is not for available for that day")
+async def book_appointment_logic_async(appointment: AppointmentCreate, db: AsyncSession):
+    patient_res = await get_patient_name_phone_data_async(appointment.patient_name, appointment.patient_phone, db)
+
+    doctor_res = await get_doctor_name_phone_data_async(appointment.doctor_name, appointment.doctor_phone, db)
+    if not doctor_res:
+        raise AppointmentNotFoundError("Sorry, the doctor is not exist")
+    if not patient_res:
+        raise AppointmentNotFoundError("Sorry, the patient is not exist")
 
-    return book_appointment_data(doctor_res.id, patient_res.id, appointment.appointment_date, db)
+    # Plain ids: a rollback expires the loaded objects. Ending the lookups' read
+    # transaction makes the doctor lock the first statement of the booking transaction,
+    # so the association check, overlap check and insert all run under it.
+    doctor_id, patient_id = doctor_res.id, patient_res.id
+    await db.rollback()
+    start, end = _appointment_interval(appointment)
+    for attempt in range(BOOKING_MAX_ATTEMPTS):
+        try:
+            await lock_doctor_data_async(doctor_id, db)
+            if not await check_patient_doctor_logic_async(doctor_id, patient_id, db):
+                await db.rollback()
+                raise Exception("Sorry, the doctor is not for the patient")
+            if await get_overlapping_appointments_async(doctor_id, start, end, db):
+                await db.rollback()
+                raise AppointmentConflictError("Sorry, the doctor is not available at that time")
+            return await book_appointment_data_async(doctor_id, patient_id, start, db, appointment.duration_minutes)
+        except IntegrityError:
+            # Another booking of the same start time committed first
+            await db.rollback()
+            raise AppointmentConflictError("Sorry, the doctor is not available at that time")
+        except DBAPIError as e:
+            await db.rollback()
+            if not _is_retryable(e) or attempt == BOOKING_MAX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
@@ -0,0 +1,212 @@
+import datetime
+import json
+import os
+from bisect import bisect_left, insort
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from appointment.dto import AppointmentImport, DoctorCreate, PatientCreate, PatientDoctorCreate
+from appointment.models import Appointment, Doctor, Patient, doctor_patient_association
+from appointment.repository.appointment_repository import get_doctor_appointments_between_async
+from appointment.repository.bulk_repository import insert_rows_data_async
+from appointment.repository.doctor_patient_repository import get_patient_doctor_pairs_data_async
+from appointment.repository.doctors_repository import get_existing_doctor_ids_data_async, lock_doctor_data_async
+from appointment.repository.patient_repository import get_existing_patient_ids_data_async
+
+# Rows inserted and committed per transaction
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+
+async def iter_ndjson_rows(chunks):
+    """JSON objects of an NDJSON byte stream, one per non-empty line, as they arrive.
+
+    A line that is not valid JSON is yielded as the ValueError, so it can be
+    reported as that row's error.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+async def iter_json_rows(rows):
+    for row in rows:
+        yield row
+
+
+def _doctor_row(doctor: DoctorCreate):
+    return {"name": doctor.name, "phone": doctor.phone}
+
+
+def _patient_row(patient: PatientCreate):
+    return {"name": patient.name, "phone": patient.phone}
+
+
+def _association_row(association: PatientDoctorCreate):
+    return {"doctor_id": association.doctor_id, "patient_id": association.patient_id}
+
+
+async def _insert_chunk(table, to_row, chunk, db: AsyncSession):
+    return await insert_rows_data_async(table, [to_row(item) for item in chunk], db)
+
+
+async def _reference_errors(chunk, doctor_ids, db: AsyncSession):
+    """{chunk position: error} for rows whose doctor or patient does not exist or
+    whose patient is not assigned to the doctor, with one lookup per table."""
+    patient_ids = sorted({item.patient_id for item in chunk})
+    doctors = await get_existing_doctor_ids_data_async(doctor_ids, db)
+    patients = await get_existing_patient_ids_data_async(patient_ids, db)
+    pairs = await get_patient_doctor_pairs_data_async(doctor_ids, patient_ids, db)
+
+    errors = {}
+    for position, item in enumerate(chunk):
+        if item.doctor_id not in doctors:
+            errors[position] = f"Doctor {item.doctor_id} does not exist"
+        elif item.patient_id not in patients:
+            errors[position] = f"Patient {item.patient_id} does not exist"
+        elif (item.doctor_id, item.patient_id) not in pairs:
+            errors[position] = f"Patient {item.patient_id} is not assigned to doctor {item.doctor_id}"
+    return errors
+
+
+async def _insert_appointment_chunk(chunk, db: AsyncSession):
+    """Insert the appointments of a chunk whose doctor and patient exist and are
+    associated, and that overlap neither an existing appointment nor an earlier row
+    of the import."""
+    doctor_ids = sorted({item.doctor_id for item in chunk})
+    # Same lock as a single booking, taken in id order so concurrent imports cannot deadlock
+    for doctor_id in doctor_ids:
+        await lock_doctor_data_async(doctor_id, db)
+
+    # SQLite does not enforce the foreign keys, so check them like a single booking does
+    errors = await _reference_errors(chunk, doctor_ids, db)
+    intervals = [_interval(item) for item in chunk]
+    valid = [position for position in range(len(chunk)) if position not in errors]
+    booked = {}
+    if valid:
+        existing = await get_doctor_appointments_between_async(
+            sorted({chunk[p].doctor_id for p in valid}),
+            min(intervals[p][0] for p in valid), max(intervals[p][1] for p in valid), db
+        )
+        for appointment in existing:
+            insort(booked.setdefault(appointment.doctor_id, []), (
+                appointment.appointment_date,
+                appointment.appointment_date + datetime.timedelta(minutes=appointment.duration_minutes),
+            ))
+
+    accepted = []
+    for position in valid:
+        item, (start, end) = chunk[position], intervals[position]
+        doctor_booked = booked.setdefault(item.doctor_id, [])
+        i = bisect_left(doctor_booked, (start, end))
+        # Only the neighbours can overlap, since booked intervals do not overlap each other
+        if (i > 0 and doctor_booked[i - 1][1] > start) or (i < len(doctor_booked) and doctor_booked[i][0] < end):
+            errors[position] = "Overlaps another appointment of the doctor"
+            continue
+        doctor_booked.insert(i, (start, end))
+        accepted.append(position)
+
+    rows = [
+        {"doctor_id": chunk[p].doctor_id, "patient_id": chunk[p].patient_id,
+         "appointment_date": intervals[p][0], "duration_minutes": chunk[p].duration_minutes}
+        for p in accepted
+    ]
+    ids = [None] * len(chunk)
+    if rows:
+        inserted_ids, insert_errors = await insert_rows_data_async(Appointment.__table__, rows, db)
+        for position, new_id in zip(accepted, inserted_ids):
+            ids[position] = new_id
+        for accepted_position, error in insert_errors.items():
+            errors[accepted[accepted_position]] = error
+    return ids, errors
+
+
+def _interval(item: AppointmentImport):
+    start = item.appointment_date.replace(tzinfo=None)
+    return start, start + datetime.timedelta(minutes=item.duration_minutes)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in error.errors())
+
+
+async def _import_rows_async(rows, dto_class: type[BaseModel], insert_chunk, db: AsyncSession, chunk_size: int):
+    """Validate rows, insert the valid ones chunk by chunk (one transaction per chunk)
+    and report the new ids and every row's error by row number (0-based)."""
+    ids = []
+    errors = []
+    chunk = []
+    chunk_rows = []
+
+    async def flush():
+        chunk_ids, chunk_errors = await insert_chunk(chunk, db)
+        await db.commit()
+        for position, new_id in enumerate(chunk_ids):
+            ids[chunk_rows[position]] = new_id
+        for position, error in chunk_errors.items():
+            errors.append({"row": chunk_rows[position], "error": error})
+        chunk.clear()
+        chunk_rows.clear()
+
+    row_number = 0
+    async for row in rows:
+        ids.append(None)
+        try:
+            if isinstance(row, Exception):
+                raise row
+            chunk.append(dto_class.model_validate(row))
+            chunk_rows.append(row_number)
+        except ValidationError as e:
+            errors.append({"row": row_number, "error": _validation_message(e)})
+        except ValueError as e:
+            errors.append({"row": row_number, "error": str(e)})
+        row_number += 1
+        if len(chunk) >= chunk_size:
+            await flush()
+    if chunk:
+        await flush()
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "received": row_number,
+        "inserted": row_number - len(errors),
+        "failed": len(errors),
+        # Aligned with the rows, None for failed rows (and for associations, which have no id)
+        "ids": ids,
+        "errors": errors,
+    }
+
+
+async def import_doctors_logic_async(rows, db: AsyncSession, chunk_size: int = BULK_CHUNK_SIZE):
+    async def insert_chunk(chunk, db):
+        return await _insert_chunk(Doctor.__table__, _doctor_row, chunk, db)
+    return await _import_rows_async(rows, DoctorCreate, insert_chunk, db, chunk_size)
+
+
+async def import_patients_logic_async(rows, db: AsyncSession, chunk_size: int = BULK_CHUNK_SIZE):
+    async def insert_chunk(chunk, db):
+        return await _insert_chunk(Patient.__table__, _patient_row, chunk, db)
+    return await _import_rows_async(rows, PatientCreate, insert_chunk, db, chunk_size)
+
+
+async def import_doctor_patients_logic_async(rows, db: AsyncSession, chunk_size: int = BULK_CHUNK_SIZE):
+    async def insert_chunk(chunk, db):
+        return await _insert_chunk(doctor_patient_association, _association_row, chunk, db)
+    return await _import_rows_async(rows, PatientDoctorCreate, insert_chunk, db, chunk_size)
+
+
+async def import_appointments_logic_async(rows, db: AsyncSession, chunk_size: int = BULK_CHUNK_SIZE):
+    return await _import_rows_async(rows, AppointmentImport, _insert_appointment_chunk, db, chunk_size)
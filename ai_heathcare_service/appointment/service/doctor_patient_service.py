@@ -1,12 +1,29 @@
 from appointment.dto import PatientDoctorCreate
-from appointment.repository.doctor_patient_repository import check_patient_doctor_data, create_patient_doctor_data, get_all_patient_doctor_data
+from appointment.repository.doctor_patient_repository import (
+    check_patient_doctor_data,
+    check_patient_doctor_data_async,
+    create_patient_doctor_data,
+    create_patient_doctor_data_async,
+    get_all_patient_doctor_data,
+    get_all_patient_doctor_data_async,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-def check_patient_doctor_logic(doctor_id: int, patient_id: int):
-    return check_patient_doctor_data(doctor_id, patient_id)
+def check_patient_doctor_logic(doctor_id: int, patient_id: int, db: Session):
+    return check_patient_doctor_data(doctor_id, patient_id, db)
 
-def create_patient_doctor_logic(patient_doctor: PatientDoctorCreate):
-    return create_patient_doctor_data(patient_doctor)
+def create_patient_doctor_logic(patient_doctor: PatientDoctorCreate, db: Session):
+    return create_patient_doctor_data(patient_doctor, db)
 
-def get_all_patient_doctor_logic():
-    return get_all_patient_doctor_data()
-    
\ No newline at end of file
+def get_all_patient_doctor_logic(db: Session):
+    return get_all_patient_doctor_data(db)
+
+async def check_patient_doctor_logic_async(doctor_id: int, patient_id: int, db: AsyncSession):
+    return await check_patient_doctor_data_async(doctor_id, patient_id, db)
+
+async def create_patient_doctor_logic_async(patient_doctor: PatientDoctorCreate, db: AsyncSession):
+    return await create_patient_doctor_data_async(patient_doctor, db)
+
+async def get_all_patient_doctor_logic_async(db: AsyncSession):
+    return await get_all_patient_doctor_data_async(db)
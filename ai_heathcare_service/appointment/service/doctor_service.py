@@ -1,9 +1,21 @@
 from appointment.dto import DoctorCreate
-from appointment.repository.doctors_repository import create_doctor_data, get_all_doctors_data
+from appointment.repository.doctors_repository import (
+    create_doctor_data,
+    create_doctor_data_async,
+    get_all_doctors_data,
+    get_all_doctors_data_async,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 def get_all_doctors(db: Session):
     return get_all_doctors_data(db)
 
 def create_doctor_logic(doctor: DoctorCreate, db: Session):
-    return create_doctor_data(doctor, db)
\ No newline at end of file
+    return create_doctor_data(doctor, db)
+
+async def get_all_doctors_async(db: AsyncSession):
+    return await get_all_doctors_data_async(db)
+
+async def create_doctor_logic_async(doctor: DoctorCreate, db: AsyncSession):
+    return await create_doctor_data_async(doctor, db)
@@ -1,5 +1,11 @@
 from appointment.dto import PatientCreate
-from appointment.repository.patient_repository import create_patient_data, get_all_patients_data
+from appointment.repository.patient_repository import (
+    create_patient_data,
+    create_patient_data_async,
+    get_all_patients_data,
+    get_all_patients_data_async,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
@@ -7,4 +13,10 @@ def get_all_patients(db: Session):
     return get_all_patients_data(db)
 
 def create_patient_logic(patient: PatientCreate, db: Session):
-    return create_patient_data(patient, db)
\ No newline at end of file
+    return create_patient_data(patient, db)
+
+async def get_all_patients_async(db: AsyncSession):
+    return await get_all_patients_data_async(db)
+
+async def create_patient_logic_async(patient: PatientCreate, db: AsyncSession):
+    return await create_patient_data_async(patient, db)
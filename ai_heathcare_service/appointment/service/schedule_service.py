@@ -0,0 +1,83 @@
+import datetime
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate, groupby
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from appointment.dto import DoctorScheduleCreate
+from appointment.repository.appointment_repository import get_doctor_appointments_between_async
+from appointment.repository.schedule_repository import create_schedule_data_async, get_schedules_data_async
+
+
+def compute_free_slots(schedules, appointments, start_date: datetime.date, end_date: datetime.date):
+    """Slots of one doctor's working-hour templates between two dates (inclusive) that
+    no appointment overlaps.
+
+    Booked intervals are sorted once with a running maximum of their end times, so
+    each candidate slot is checked with one binary search: the slot is taken if any
+    appointment starting before the slot ends is still running when it starts.
+    """
+    booked = sorted(
+        (a.appointment_date, a.appointment_date + datetime.timedelta(minutes=a.duration_minutes))
+        for a in appointments
+    )
+    booked_starts = [start for start, _ in booked]
+    latest_end = list(accumulate((end for _, end in booked), max))
+
+    by_weekday = defaultdict(list)
+    for schedule in schedules:
+        by_weekday[schedule.weekday].append(schedule)
+
+    slots = []
+    day = start_date
+    while day <= end_date:
+        for schedule in by_weekday.get(day.weekday(), ()):
+            step = datetime.timedelta(minutes=schedule.slot_minutes)
+            slot_start = datetime.datetime.combine(day, schedule.start_time)
+            shift_end = datetime.datetime.combine(day, schedule.end_time)
+            while slot_start + step <= shift_end:
+                slot_end = slot_start + step
+                i = bisect_left(booked_starts, slot_end)
+                if i == 0 or latest_end[i - 1] <= slot_start:
+                    slots.append((slot_start, slot_end))
+                slot_start = slot_end
+        day += datetime.timedelta(days=1)
+
+    return [{"start": start, "end": end} for start, end in sorted(set(slots))]
+
+
+async def get_free_slots_logic_async(start_date: datetime.date, end_date: datetime.date, db: AsyncSession, doctor_ids=None):
+    """Free slots per doctor id, for every doctor with working hours (or only `doctor_ids`).
+
+    Two queries regardless of the number of doctors: their templates, and their
+    appointments in the range, both ordered by doctor.
+    """
+    schedules = await get_schedules_data_async(db, doctor_ids)
+    schedules_by_doctor = {
+        doctor_id: list(group) for doctor_id, group in groupby(schedules, key=lambda s: s.doctor_id)
+    }
+    if not schedules_by_doctor:
+        return {}
+
+    range_start = datetime.datetime.combine(start_date, datetime.time.min)
+    range_end = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min)
+    appointments = await get_doctor_appointments_between_async(list(schedules_by_doctor), range_start, range_end, db)
+    appointments_by_doctor = {
+        doctor_id: list(group) for doctor_id, group in groupby(appointments, key=lambda a: a.doctor_id)
+    }
+
+    return {
+        doctor_id: compute_free_slots(doctor_schedules, appointments_by_doctor.get(doctor_id, []), start_date, end_date)
+        for doctor_id, doctor_schedules in schedules_by_doctor.items()
+    }
+
+
+async def get_schedules_logic_async(doctor_id: int, db: AsyncSession):
+    return await get_schedules_data_async(db, [doctor_id])
+
+
+async def create_schedule_logic_async(doctor_id: int, schedule: DoctorScheduleCreate, db: AsyncSession):
+    if schedule.end_time <= schedule.start_time:
+        raise ValueError("end_time must be after start_time")
+    return await create_schedule_data_async(doctor_id, schedule, db)
@@ -1,10 +1,21 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from appointment.dto import  UserDTO, UserPatientCreate
-from appointment.repository.user_repository import create_user_with_patient_model, get_user_by_username_phone_model
+from appointment.repository.user_repository import (
+    create_user_with_patient_model,
+    create_user_with_patient_model_async,
+    get_user_by_username_phone_model,
+    get_user_by_username_phone_model_async,
+)
 
 def create_user_logic(db: Session, user: UserPatientCreate):
     return create_user_with_patient_model(db, user)
 
 def get_user_username_phone_logic(db: Session, username: str):
     return get_user_by_username_phone_model(db, username)
-    
\ No newline at end of file
+
+async def create_user_logic_async(db: AsyncSession, user: UserPatientCreate):
+    return await create_user_with_patient_model_async(db, user)
+
+async def get_user_username_phone_logic_async(db: AsyncSession, username: str):
+    return await get_user_by_username_phone_model_async(db, username)
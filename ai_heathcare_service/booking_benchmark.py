@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+# Concurrency benchmark of POST /appointments/book-appointment, run in-process
+# against a local database:
+#
+#   python booking_benchmark.py --hot 200 --cold 800 --concurrency 100
+#   python booking_benchmark.py --database-url postgresql://postgres:<password>@localhost/bench_db
+#
+# "hot" requests all ask for the same doctor and minute, "cold" requests spread
+# over many doctors and slots. Exactly one hot request may succeed; the report
+# counts double bookings (overlapping appointments of one doctor), which must be 0.
+# The database is filled with benchmark doctors and a patient, use a scratch one.
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hammer the booking endpoint and check for double bookings")
+    parser.add_argument("--database-url", default=None,
+                        help="Sync database URL (default: a new SQLite file in a temporary directory)")
+    parser.add_argument("--doctors", type=int, default=20)
+    parser.add_argument("--hot", type=int, default=200, help="Requests for the one hot slot")
+    parser.add_argument("--cold", type=int, default=800, help="Requests spread over the cold slots")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+    args = parser.parse_args(argv)
+    if args.doctors < 2:
+        parser.error("--doctors must be at least 2: one hot, the others cold")
+    return args
+
+
+def count_double_bookings(appointments) -> int:
+    """Appointments that overlap an earlier appointment of the same doctor."""
+    double_bookings = 0
+    latest_end = {}
+    for doctor_id, start, duration_minutes in sorted(appointments):
+        end = start + datetime.timedelta(minutes=duration_minutes)
+        if doctor_id in latest_end and start < latest_end[doctor_id]:
+            double_bookings += 1
+        latest_end[doctor_id] = max(end, latest_end.get(doctor_id, end))
+    return double_bookings
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import select
+
+    from appointment.core.db import SessionLocal, get_pool_stats
+    from appointment.models import Appointment, Doctor, Patient, doctor_patient_association
+    from main import app
+
+    with SessionLocal() as db:
+        patient = Patient(name="Benchmark Patient", phone="000")
+        doctors = [Doctor(name=f"Benchmark Doctor {i}", phone=f"bench-{i}") for i in range(args.doctors)]
+        db.add_all([patient, *doctors])
+        db.flush()
+        db.execute(doctor_patient_association.insert(),
+                   [{"doctor_id": doctor.id, "patient_id": patient.id} for doctor in doctors])
+        db.commit()
+        doctor_names = [(doctor.name, doctor.phone) for doctor in doctors]
+
+    # Far enough ahead to never collide with real bookings
+    day = datetime.datetime(2100, 1, 4, 8, 0)
+    # Doctor 0 has the hot slot, the others share the cold ones. Every cold slot is
+    # requested twice, so conflicts on cold slots are exercised too.
+    requests = [(0, day) for _ in range(args.hot)]
+    cold_doctors = args.doctors - 1
+    for i in range(args.cold):
+        slot = i // 2
+        requests.append((1 + slot % cold_doctors, day + datetime.timedelta(minutes=30 * (slot // cold_doctors))))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        username = f"bench-{time.time_ns()}"
+        await client.post("/auth/users/", json={"username": username, "password": "bench", "name": "Benchmark User",
+                                                "phone_number": "000"})
+        token = (await client.post("/auth/token", data={"username": username, "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def book(doctor: int, start: datetime.datetime) -> int:
+            name, phone = doctor_names[doctor]
+            async with semaphore:
+                response = await client.post("/appointments/book-appointment", headers=headers, json={
+                    "patient_name": "Benchmark Patient", "patient_phone": "000",
+                    "doctor_name": name, "doctor_phone": phone,
+                    "appointment_date": start.isoformat(), "duration_minutes": 30,
+                })
+            return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(book(doctor, start) for doctor, start in requests))
+        elapsed = time.perf_counter() - started
+
+    hot_statuses = statuses[:args.hot]
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Appointment.doctor_id, Appointment.appointment_date, Appointment.duration_minutes)
+            .join(Doctor, Doctor.id == Appointment.doctor_id)
+            .where(Doctor.phone.like("bench-%"))
+        ).all()
+
+    booked = sum(status == 200 for status in statuses)
+    report = {
+        "requests": len(statuses),
+        "seconds": round(elapsed, 2),
+        "requests_per_sec": round(len(statuses) / elapsed, 1),
+        "bookings": booked,
+        "bookings_per_sec": round(booked / elapsed, 1),
+        "conflicts_409": sum(status == 409 for status in statuses),
+        "errors": sum(status not in (200, 409) for status in statuses),
+        "hot_slot_bookings": sum(status == 200 for status in hot_statuses),
+        "double_bookings": count_double_bookings([tuple(row) for row in rows]),
+        "pool": get_pool_stats()["async"],
+    }
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='booking-bench-')}/bench.db"
+    os.environ.setdefault("SQL_ECHO", "0")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    report = asyncio.run(run(args))
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    if report["double_bookings"] or report["hot_slot_bookings"] > 1:
+        sys.exit("Double booking detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 
-from appointment.api import appointments_controller, authentication_controller, clear_cache_controller, doctor_patient_controller, doctors_controller, patients_controller
+from appointment.api import appointments_controller, authentication_controller, bulk_controller, clear_cache_controller, database_controller, doctor_patient_controller, doctors_controller, patients_controller
 
 app = FastAPI()
 
@@ -38,3 +38,13 @@ app.include_router(
     prefix="/auth",
     tags=["auth"],
 )
+app.include_router(
+    database_controller.router,
+    prefix="/database",
+    tags=["database"],
+)
+app.include_router(
+    bulk_controller.router,
+    prefix="/bulk",
+    tags=["bulk"],
+)
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Format of appointment times, in storage and in the API. Strings in this format
+# sort chronologically, so range queries can use the indexes.
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Run as one transaction, so processes opening a new file at the same time do not
+# seed the counter twice
+_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY,
+    doctor TEXT NOT NULL,
+    doctor_key TEXT NOT NULL,
+    patient_name TEXT NOT NULL,
+    appointment_time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (doctor_key, appointment_time)
+);
+CREATE INDEX IF NOT EXISTS appointments_by_time ON appointments (appointment_time);
+CREATE TABLE IF NOT EXISTS appointment_count (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO appointment_count (id, value) SELECT 1, COUNT(*) FROM appointments;
+CREATE TRIGGER IF NOT EXISTS appointment_count_insert AFTER INSERT ON appointments
+BEGIN
+    UPDATE appointment_count SET value = value + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS appointment_count_delete AFTER DELETE ON appointments
+BEGIN
+    UPDATE appointment_count SET value = value - 1 WHERE id = 1;
+END;
+COMMIT;
+"""
+
+
+def doctor_key(doctor: str) -> str:
+    """Normalized doctor name, so "Dr. Lisa Kumar" and "dr.  lisa kumar" share one calendar."""
+    return " ".join(doctor.lower().split())
+
+
+class AppointmentStore:
+    """Bookings in a SQLite file, shared by every worker process that opens it.
+
+    The UNIQUE (doctor, time) index makes a conflict check an index lookup, and a
+    booking a single INSERT that the index rejects if the slot is taken, so two
+    processes booking the same slot cannot both succeed. The total count is kept
+    in a one-row table maintained by triggers.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit: every statement is its own transaction
+        self._db = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "doctor": row["doctor"],
+            "patient_name": row["patient_name"],
+            "appointment_time": row["appointment_time"],
+            "status": row["status"],
+        }
+
+    def book(self, doctor: str, patient_name: str, appointment_time: datetime) -> Optional[Dict[str, Any]]:
+        """Record a confirmed appointment, or return None if the doctor is already booked at that minute."""
+        time_text = appointment_time.strftime(TIME_FORMAT)
+        with self._lock:
+            try:
+                cursor = self._db.execute(
+                    "INSERT INTO appointments (doctor, doctor_key, patient_name, appointment_time, status, created_at) "
+                    "VALUES (?, ?, ?, ?, 'confirmed', ?)",
+                    (doctor, doctor_key(doctor), patient_name, time_text, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+            except sqlite3.IntegrityError as e:
+                # Only the (doctor, time) index means the slot is taken, NOT NULL and others are bugs
+                if "appointments.doctor_key, appointments.appointment_time" in str(e):
+                    return None
+                raise
+        return {
+            "id": cursor.lastrowid,
+            "doctor": doctor,
+            "patient_name": patient_name,
+            "appointment_time": time_text,
+            "status": "confirmed",
+        }
+
+    def list(self, doctor: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Appointments in time order, optionally of one doctor and within [start, end)."""
+        conditions = []
+        params: List[Any] = []
+        if doctor is not None:
+            conditions.append("doctor_key = ?")
+            params.append(doctor_key(doctor))
+        if start is not None:
+            conditions.append("appointment_time >= ?")
+            params.append(start.strftime(TIME_FORMAT))
+        if end is not None:
+            conditions.append("appointment_time < ?")
+            params.append(end.strftime(TIME_FORMAT))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM appointments {where} ORDER BY appointment_time, id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def count(self) -> int:
+        """Total number of appointments, from the trigger-maintained counter."""
+        with self._lock:
+            return self._db.execute("SELECT value FROM appointment_count WHERE id = 1").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,212 @@
+import asyncio
+import contextlib
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import rag_config
+import rag_metrics
+from rag_retrieval import RETRIEVAL_MODES
+from rag_system import (book_appointment, get_rag_system, health_status, list_appointments, rag_systems, reindex,
+                        start_background_init)
+
+# Async serving mode with the same routes as the Flask app:
+#   uvicorn rag_asgi:app --host 0.0.0.0 --port 5000
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be served in time, carries the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GenerationLimiter:
+    """Bound concurrent LLM generations with a semaphore and a bounded wait queue.
+
+    Requests beyond ``max_queue`` waiters are rejected with 429, waiters that do not
+    get a slot within ``queue_timeout`` with 503, and generations that miss the
+    request deadline with 504. A generation that misses its deadline keeps its slot
+    until the worker thread finishes, so Ollama is never handed more than
+    ``max_concurrent`` generations.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="llm")
+        self.waiting = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_timeouts = 0
+        self.deadline_exceeded = 0
+
+    def _release(self, _future: "asyncio.Future"):
+        self.active -= 1
+        self.completed += 1
+        self._semaphore.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, deadline: float, **kwargs: Any) -> Any:
+        """Run ``fn`` in a generation slot; ``deadline`` is an event loop time."""
+        loop = asyncio.get_running_loop()
+        # Counters change synchronously, so this holds even before waiters reach the semaphore
+        if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise Overloaded(429, "Too many requests waiting for the assistant, please retry shortly")
+
+        self.waiting += 1
+        try:
+            timeout = min(self.queue_timeout, deadline - loop.time())
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            raise Overloaded(503, "The assistant is busy, please retry shortly")
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        future = loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise Overloaded(504, "The assistant did not answer in time")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_timeouts": self.queue_timeouts,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+
+limiter: Optional[GenerationLimiter] = None
+
+
+async def api_query(request: Request) -> JSONResponse:
+    """API endpoint for querying the RAG system."""
+    deadline = asyncio.get_running_loop().time() + rag_config.REQUEST_DEADLINE
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not data or 'question' not in data:
+        return JSONResponse({"error": "Missing 'question' in request"}, status_code=400)
+    question = data['question']
+    mode = data.get('mode')
+    if mode is not None and mode not in RETRIEVAL_MODES:
+        return JSONResponse({"error": f"Invalid 'mode', use one of: {', '.join(RETRIEVAL_MODES)}"}, status_code=400)
+    system = get_rag_system(data.get('corpus'))
+    if system is None:
+        return JSONResponse({"error": f"Unknown 'corpus', use one of: {', '.join(rag_systems)}"}, status_code=404)
+    if not system.ready:
+        return JSONResponse({"error": "RAG system is starting, please retry shortly",
+                             "initialization": system.status()},
+                            status_code=503, headers={"Retry-After": "5"})
+
+    include_timings = bool(data.get('timings', rag_config.RESPONSE_TIMINGS))
+    try:
+        # Cached and directory answers do not need a generation slot
+        start = time.perf_counter()
+        result = await run_in_threadpool(system.fast_answer, question, mode)
+        if result is None:
+            # Retrieval and prompt building run in the normal threadpool, so concurrent
+            # questions reach the embedding micro-batcher together; only the LLM call
+            # waits for a generation slot, which every corpus shares
+            prepared = await run_in_threadpool(system.prepare_query, question, mode, start)
+            generation = await limiter.run(system.generate, prepared, deadline=deadline)
+            result = await run_in_threadpool(system.finish_query, prepared, generation,
+                                             include_timings=include_timings)
+        elif include_timings:
+            result = dict(result, timings={"total_ms": round((time.perf_counter() - start) * 1000, 1), "llm": False})
+        return JSONResponse(result)
+    except Overloaded as e:
+        headers = {"Retry-After": "1"} if e.status_code in (429, 503) else None
+        return JSONResponse({"error": str(e)}, status_code=e.status_code, headers=headers)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+async def api_book_appointment(request: Request) -> JSONResponse:
+    """API endpoint for booking an appointment."""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    body, status = await run_in_threadpool(book_appointment, data)
+    return JSONResponse(body, status_code=status)
+
+
+async def api_list_appointments(request: Request) -> JSONResponse:
+    """API endpoint for listing booked appointments."""
+    body, status = await run_in_threadpool(list_appointments, dict(request.query_params))
+    return JSONResponse(body, status_code=status)
+
+
+async def api_reindex(request: Request) -> JSONResponse:
+    """API endpoint for picking up changed documents without a restart."""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    body, status = await run_in_threadpool(reindex, data)
+    return JSONResponse(body, status_code=status)
+
+
+async def api_metrics(request: Request) -> PlainTextResponse:
+    """Query counters and per-stage latency histograms in the Prometheus text format."""
+    return PlainTextResponse(rag_metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+async def api_health(request: Request) -> JSONResponse:
+    """API endpoint for checking system health."""
+    status = health_status()
+    status["llm_limiter"] = limiter.stats()
+    return JSONResponse(status)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    # The semaphore must be created inside the server's event loop
+    global limiter
+    limiter = GenerationLimiter(
+        max_concurrent=rag_config.LLM_MAX_CONCURRENCY,
+        max_queue=rag_config.LLM_MAX_QUEUE,
+        queue_timeout=rag_config.LLM_QUEUE_TIMEOUT,
+    )
+    # Serve health checks right away while models and the index load
+    start_background_init()
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route("/api/query", api_query, methods=["POST"]),
+        Route("/api/book-appointment", api_book_appointment, methods=["POST"]),
+        Route("/api/appointments", api_list_appointments, methods=["GET"]),
+        Route("/api/reindex", api_reindex, methods=["POST"]),
+        Route("/api/health", api_health, methods=["GET"]),
+        Route("/api/metrics", api_metrics, methods=["GET"]),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+    lifespan=lifespan,
+)
@@ -0,0 +1,91 @@
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+class _PendingQuery:
+    __slots__ = ("text", "done", "vector", "error")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.done = threading.Event()
+        self.vector: Optional[List[float]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """Embeddings wrapper that gathers concurrent ``embed_query`` calls for up to
+    ``window_ms`` milliseconds or ``max_batch_size`` items and embeds them in one
+    batched forward pass on a background thread.
+
+    ``embed_documents`` is already batched and goes straight to the wrapped model.
+    """
+
+    def __init__(self, embeddings: Embeddings, window_ms: float = 5.0, max_batch_size: int = 32):
+        self.embeddings = embeddings
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[_PendingQuery]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        pending = _PendingQuery(text)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vector
+
+    def _collect(self) -> List[_PendingQuery]:
+        """Block for the first query, then gather more until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                vectors = self.embeddings.embed_documents([pending.text for pending in batch])
+                for pending, vector in zip(batch, vectors):
+                    pending.vector = vector
+            except BaseException as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+            with self._lock:
+                self.batches += 1
+                self.queries += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "queries": self.queries,
+                "avg_batch_size": self.queries / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+            }
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Load test for /api/query. Replays a question corpus at a target concurrency and
+# request rate and reports latency percentiles, throughput and error rate as JSON.
+#
+#   python rag_benchmark.py --serve --concurrency 8 --rate 20 --requests 200
+#   python rag_benchmark.py --url http://localhost:5000 --concurrency 4
+
+
+def load_questions(path: str) -> List[Dict[str, Any]]:
+    """Read a JSONL file of {"question": ..., "mode": optional} objects."""
+    questions = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                questions.append(json.loads(line))
+    if not questions:
+        raise ValueError(f"No questions in {path}")
+    return questions
+
+
+def serve_in_process(port: int, cache: bool) -> str:
+    """Start the Flask app on a background thread with the fake LLM and return its URL."""
+    # rag_config reads the environment at import time
+    os.environ.setdefault("RAG_LLM_BACKEND", "fake")
+    if not cache:
+        os.environ["RAG_ANSWER_CACHE_ENABLED"] = "0"
+    from werkzeug.serving import make_server
+    from rag_system import app, rag_system
+
+    rag_system.start_background_init()
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="benchmark-server", daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+def wait_until_ready(url: str, timeout: float):
+    """Poll /api/health until the RAG system reports ready."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/api/health", timeout=5) as response:
+                status = json.load(response)
+            if status.get("system_ready"):
+                return
+            if status.get("initialization", {}).get("status") == "failed":
+                raise RuntimeError(f"RAG system failed to initialize: {status['initialization']}")
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{url} was not ready after {timeout:.0f}s")
+        time.sleep(0.5)
+
+
+def send_query(url: str, body: Dict[str, Any], timeout: float) -> int:
+    """POST one question and return the HTTP status, 0 if no response was received."""
+    request = urllib.request.Request(
+        f"{url}/api/query",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+def run_load(url: str, questions: List[Dict[str, Any]], total: int, concurrency: int,
+             rate: float, timeout: float) -> Dict[str, Any]:
+    """Send ``total`` requests from ``concurrency`` threads, at most ``rate`` per second.
+
+    With a rate, request ``i`` is due at ``start + i / rate`` and its latency is measured
+    from that due time, so a server that falls behind shows up in the percentiles
+    instead of silently lowering the offered load. Without a rate every thread sends
+    its next request as soon as the previous one is answered.
+    """
+    lock = threading.Lock()
+    next_index = 0
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    start = time.perf_counter()
+
+    def worker():
+        nonlocal next_index
+        while True:
+            with lock:
+                index = next_index
+                next_index += 1
+            if index >= total:
+                return
+            due = start + index / rate if rate > 0 else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            body = dict(questions[index % len(questions)])
+            status = send_query(url, body, timeout)
+            latency = time.perf_counter() - due
+            with lock:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if status == 200:
+                    latencies.append(latency)
+
+    threads = [threading.Thread(target=worker, name=f"benchmark-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+
+    ok = statuses.get("200", 0)
+    report: Dict[str, Any] = {
+        "url": url,
+        "requests": total,
+        "concurrency": concurrency,
+        "target_rate": rate or None,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(ok / duration, 2) if duration > 0 else 0.0,
+        "ok": ok,
+        "errors": total - ok,
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "status_codes": dict(sorted(statuses.items())),
+        "latency_ms": None,
+    }
+    if latencies:
+        ms = np.array(latencies) * 1000.0
+        report["latency_ms"] = {
+            "p50": round(float(np.percentile(ms, 50)), 2),
+            "p95": round(float(np.percentile(ms, 95)), 2),
+            "p99": round(float(np.percentile(ms, 99)), 2),
+            "mean": round(float(ms.mean()), 2),
+            "max": round(float(ms.max()), 2),
+        }
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test the RAG /api/query endpoint")
+    parser.add_argument("--url", default="http://localhost:5000", help="Base URL of a running server")
+    parser.add_argument("--serve", action="store_true",
+                        help="Start the Flask app in this process with the fake LLM instead of using --url")
+    parser.add_argument("--port", type=int, default=5055, help="Port of the in-process server")
+    parser.add_argument("--cache", action="store_true", help="Keep the answer cache on when serving in process")
+    parser.add_argument("--questions", default="evaluation/benchmark_questions.jsonl", help="JSONL question corpus")
+    parser.add_argument("--requests", type=int, default=100, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client threads")
+    parser.add_argument("--rate", type=float, default=0.0, help="Target requests per second, 0 for closed loop")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--ready-timeout", type=float, default=600.0, help="Seconds to wait for startup")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    questions = load_questions(args.questions)
+    url = serve_in_process(args.port, args.cache) if args.serve else args.url.rstrip("/")
+    wait_until_ready(url, args.ready_timeout)
+
+    report = run_load(url, questions, args.requests, args.concurrency, args.rate, args.timeout)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    result: Dict[str, Any]
+    vector: np.ndarray
+    created_at: float
+
+
+class AnswerCache:
+    """Two-level answer cache: exact match on the normalized question, then nearest
+    neighbour on the question embedding above a similarity threshold.
+
+    Entries are evicted least-recently-used beyond ``max_entries`` and expire after
+    ``ttl_seconds``. The whole cache is dropped on the first lookup after the corpus
+    version changes, i.e. after a startup or ``/api/reindex`` that indexed changed documents.
+    """
+
+    def __init__(self, embeddings: Any, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.95):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.corpus_version: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # Question vectors computed by a missed get(), reused by the following put()
+        self._pending_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Stacked entry vectors for the nearest-neighbour search, rebuilt when entries change
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: list = []
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace."""
+        question = re.sub(r"[^\w\s]", " ", question.lower())
+        return " ".join(question.split())
+
+    def _embed(self, key: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(key), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, corpus_version: Optional[str]):
+        """Drop every entry if the indexed corpus changed. Caller holds the lock."""
+        if corpus_version != self.corpus_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._pending_vectors.clear()
+            self._matrix = None
+            self.corpus_version = corpus_version
+
+    def _expire(self, now: float):
+        """Remove entries older than the TTL. Caller holds the lock."""
+        expired = [key for key, entry in self._entries.items()
+                   if now - entry.created_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+            self.evictions += 1
+        if expired:
+            self._matrix = None
+
+    def get(self, question: str, corpus_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a question, or None on a miss."""
+        key = self.normalize(question)
+        now = time.time()
+        with self._lock:
+            self._check_version(corpus_version)
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry.result
+            if not self._entries:
+                self.misses += 1
+                return None
+
+        # Embed outside the lock so concurrent lookups are not serialized on the model
+        vector = self._embed(key)
+
+        with self._lock:
+            if self._matrix is None:
+                self._matrix_keys = list(self._entries.keys())
+                self._matrix = (np.stack([self._entries[k].vector for k in self._matrix_keys])
+                                if self._matrix_keys else None)
+            if self._matrix is not None:
+                scores = self._matrix @ vector
+                best = int(np.argmax(scores))
+                best_key = self._matrix_keys[best]
+                if scores[best] >= self.similarity_threshold and best_key in self._entries:
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return self._entries[best_key].result
+
+            self.misses += 1
+            self._pending_vectors[key] = vector
+            while len(self._pending_vectors) > self.max_entries:
+                self._pending_vectors.popitem(last=False)
+            return None
+
+    def put(self, question: str, result: Dict[str, Any], corpus_version: Optional[str] = None):
+        """Store the result for a question."""
+        key = self.normalize(question)
+        with self._lock:
+            vector = self._pending_vectors.pop(key, None)
+        if vector is None:
+            vector = self._embed(key)
+
+        with self._lock:
+            self._check_version(corpus_version)
+            self._entries[key] = CacheEntry(result=result, vector=vector, created_at=time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._pending_vectors.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
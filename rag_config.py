@@ -0,0 +1,88 @@
+import os
+
+# Settings for the RAG system. Every value can be overridden with an environment variable.
+
+EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+# Ingestion
+CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "50"))
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+# 0 embeds in the main process, N > 0 starts a pool of N worker processes
+EMBED_WORKERS = int(os.getenv("RAG_EMBED_WORKERS", "0"))
+# Content-addressed cache of document embeddings (model + text hash -> vector), reused
+# by re-indexing and evaluation; the most recently used vectors are also kept in memory
+EMBEDDING_CACHE_ENABLED = os.getenv("RAG_EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_PATH = os.getenv("RAG_EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite")
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("RAG_EMBEDDING_CACHE_MEMORY_ENTRIES", "10000"))
+# Vectors kept in the cache file, least recently used ones are deleted beyond it (0: no limit)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# Answer cache in front of RAGSystem.query
+ANSWER_CACHE_ENABLED = os.getenv("RAG_ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL = float(os.getenv("RAG_ANSWER_CACHE_TTL", "3600"))
+# Minimum cosine similarity between question embeddings for a semantic hit
+ANSWER_CACHE_SIMILARITY = float(os.getenv("RAG_ANSWER_CACHE_SIMILARITY", "0.95"))
+
+# Retrieval
+# "vector", "bm25" or "hybrid" (both fused with reciprocal rank fusion)
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+RETRIEVAL_K = int(os.getenv("RAG_RETRIEVAL_K", "3"))
+# Candidates taken from each ranking before fusion in hybrid mode
+HYBRID_FETCH_K = int(os.getenv("RAG_HYBRID_FETCH_K", "10"))
+
+# Async serving mode (rag_asgi.py)
+# Concurrent LLM generations, further requests wait in a bounded queue
+LLM_MAX_CONCURRENCY = int(os.getenv("RAG_LLM_MAX_CONCURRENCY", "2"))
+# Requests waiting for a generation slot before new ones are rejected with 429
+LLM_MAX_QUEUE = int(os.getenv("RAG_LLM_MAX_QUEUE", "16"))
+# Seconds a request may wait for a generation slot before it is rejected with 503
+LLM_QUEUE_TIMEOUT = float(os.getenv("RAG_LLM_QUEUE_TIMEOUT", "10"))
+# Seconds from arrival until a request is answered with 504
+REQUEST_DEADLINE = float(os.getenv("RAG_REQUEST_DEADLINE", "60"))
+
+# Cross-request batching of question embeddings, a window of 0 disables it
+QUERY_EMBED_BATCH_WINDOW_MS = float(os.getenv("RAG_QUERY_EMBED_BATCH_WINDOW_MS", "5"))
+QUERY_EMBED_BATCH_SIZE = int(os.getenv("RAG_QUERY_EMBED_BATCH_SIZE", "32"))
+
+# Vector index backend: "chroma", or "numpy" for the memory-mapped exact-search matrix
+VECTOR_BACKEND = os.getenv("RAG_VECTOR_BACKEND", "chroma")
+# Store the numpy backend's embeddings int8-quantized (4x smaller) instead of float32
+VECTOR_QUANTIZE = os.getenv("RAG_VECTOR_QUANTIZE", "0") == "1"
+
+# LLM backend: "ollama", or "fake" for the deterministic stand-in used by rag_benchmark.py
+LLM_BACKEND = os.getenv("RAG_LLM_BACKEND", "ollama")
+LLM_MODEL = os.getenv("RAG_LLM_MODEL", "llama3.2:1b")
+# Fake backend: delay before the first token, generation speed and answer length
+FAKE_LLM_LATENCY_MS = float(os.getenv("RAG_FAKE_LLM_LATENCY_MS", "200"))
+FAKE_LLM_TOKENS_PER_SEC = float(os.getenv("RAG_FAKE_LLM_TOKENS_PER_SEC", "50"))
+FAKE_LLM_MAX_TOKENS = int(os.getenv("RAG_FAKE_LLM_MAX_TOKENS", "64"))
+
+# Add a per-stage "timings" block to every /api/query response (requests can also pass "timings": true)
+RESPONSE_TIMINGS = os.getenv("RAG_RESPONSE_TIMINGS", "0") == "1"
+
+# Prompt context: token budget for the retrieved chunks, and the share of a chunk's
+# word 3-grams found in an already included chunk above which it is dropped as a duplicate
+CONTEXT_MAX_TOKENS = int(os.getenv("RAG_CONTEXT_MAX_TOKENS", "600"))
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("RAG_CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+
+# Cross-encoder reranking: over-fetch RERANK_FETCH_K candidates and keep the RETRIEVAL_K best
+RERANK_ENABLED = os.getenv("RAG_RERANK_ENABLED", "0") == "1"
+RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_FETCH_K = int(os.getenv("RAG_RERANK_FETCH_K", "10"))
+RERANK_CACHE_SIZE = int(os.getenv("RAG_RERANK_CACHE_SIZE", "4096"))
+# Skip reranking when scoring the uncached candidates is expected to take longer than this
+RERANK_LATENCY_BUDGET_MS = float(os.getenv("RAG_RERANK_LATENCY_BUDGET_MS", "150"))
+
+# Ground-truth questions answered concurrently by rag_evaluation.py
+EVAL_WORKERS = int(os.getenv("RAG_EVAL_WORKERS", "4"))
+
+# Named corpora (e.g. one per hospital branch) served by one process, selected by the
+# "corpus" request field. "default" uses data/docs and data/vectordb, any other name
+# data/corpora/<name>/docs and data/corpora/<name>/vectordb. The first is the default.
+CORPORA = [name.strip() for name in os.getenv("RAG_CORPORA", "default").split(",") if name.strip()]
+DEFAULT_CORPUS = CORPORA[0]
+
+# SQLite file of booked appointments, shared by every worker process
+APPOINTMENTS_DB = os.getenv("RAG_APPOINTMENTS_DB", "data/appointments.sqlite")
@@ -0,0 +1,93 @@
+import re
+from typing import Callable, List, Optional, Set
+
+from langchain_core.documents import Document
+
+from rag_metrics import estimate_tokens
+
+# Shortest text shared by the end of one chunk and the start of the next that counts as splitter overlap
+MIN_OVERLAP_CHARS = 20
+# Word n-gram size used to compare chunks for near-duplicates
+SHINGLE_SIZE = 3
+
+
+def _shingles(text: str) -> Set[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _overlap(previous: str, text: str) -> int:
+    """Length of the longest suffix of ``previous`` that ``text`` starts with."""
+    for length in range(min(len(previous), len(text)), MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(text[:length]):
+            return length
+    return 0
+
+
+class ContextAssembler:
+    """Turn ranked chunks into the prompt context.
+
+    Chunks are kept in relevance order. The text a chunk shares with an already
+    kept neighbour of the same file (splitter overlap) is cut, chunks that are
+    mostly contained in a kept chunk (the same doctor entry in several files) are
+    dropped, and the rest are packed greedily under ``max_tokens``.
+    """
+
+    def __init__(self, max_tokens: int = 600, duplicate_threshold: float = 0.8,
+                 count_tokens: Callable[[str], int] = estimate_tokens):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.count_tokens = count_tokens
+
+    def _trim_overlap(self, doc: Document, kept: List[Document]) -> Document:
+        source = doc.metadata.get("source")
+        for other in kept:
+            if other.metadata.get("source") != source:
+                continue
+            # The overlap is at the end of the previous chunk or the start of the next one
+            overlap = _overlap(other.page_content, doc.page_content)
+            if overlap:
+                return Document(page_content=doc.page_content[overlap:].lstrip(), metadata=doc.metadata)
+            overlap = _overlap(doc.page_content, other.page_content)
+            if overlap:
+                return Document(page_content=doc.page_content[:-overlap].rstrip(), metadata=doc.metadata)
+        return doc
+
+    def _is_duplicate(self, shingles: Set[str], kept_shingles: List[Set[str]]) -> bool:
+        if not shingles:
+            return True
+        return any(len(shingles & other) / len(shingles) >= self.duplicate_threshold
+                   for other in kept_shingles)
+
+    def assemble(self, documents: List[Document], max_tokens: Optional[int] = None) -> List[Document]:
+        """Deduplicate and pack ranked chunks under the token budget."""
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        kept: List[Document] = []
+        kept_shingles: List[Set[str]] = []
+        used = 0
+        for doc in documents:
+            doc = self._trim_overlap(doc, kept)
+            shingles = _shingles(doc.page_content)
+            if self._is_duplicate(shingles, kept_shingles):
+                continue
+            tokens = self.count_tokens(doc.page_content)
+            if used + tokens > budget:
+                # Smaller, less relevant chunks may still fit
+                continue
+            kept.append(doc)
+            kept_shingles.append(shingles)
+            used += tokens
+
+        if not kept and documents:
+            # Even the best chunk is over budget, keep its beginning
+            doc = documents[0]
+            chars = max(1, len(doc.page_content) * budget // max(1, self.count_tokens(doc.page_content)))
+            kept.append(Document(page_content=doc.page_content[:chars], metadata=doc.metadata))
+        return kept
+
+    @staticmethod
+    def join(documents: List[Document]) -> str:
+        """The context text, in the same format as the "stuff" chain."""
+        return "\n\n".join(doc.page_content for doc in documents)
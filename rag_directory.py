@@ -0,0 +1,338 @@
+import re
+from datetime import time as dtime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# "1. Dr. Sopheak Rith - Chief Cardiologist" or "#### Dr. Sopheak Rith - Chief Cardiologist"
+_HEADER_RE = re.compile(r"^\s*(?:\d+\.|#+)\s+(Dr\.\s+[^\n]+?)\s+-\s+(.+?)\s*$")
+# "   Contact Number: 099-890-765" or "**Languages:** Khmer, English"
+_FIELD_RE = re.compile(r"^\s*(?:\*\*)?([A-Za-z ]+?):(?:\*\*)?\s*(.*?)\s*$")
+_ITEM_RE = re.compile(r"^\s*-\s+(.+?)\s*$")
+_TIME_RANGE_RE = re.compile(r"(\d{1,2}):(\d{2})\s*([AP]M)\s*-\s*(\d{1,2}):(\d{2})\s*([AP]M)", re.IGNORECASE)
+# A time of day in a question: "8 AM", "8:30 p.m." or "14:00"
+_QUESTION_TIME_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m\b\.?|\b(\d{1,2}):(\d{2})\b", re.IGNORECASE)
+
+# Questions answered from the table without the LLM, matched against the whole
+# normalized question with the doctor's name replaced by DOCTOR. Anything else,
+# e.g. "Where does Dr. X work?" or "Is Dr. X open to new patients?", goes to the LLM.
+_CLAUSE_PATTERNS = {
+    "hours": [
+        r"what (?:are|is) DOCTOR (?:working |work |clinic |consultation |office )?(?:hours|schedule)",
+        r"what (?:are|is) the (?:working |work |clinic |consultation |office )?(?:hours|schedule) (?:of|for) DOCTOR",
+        r"when (?:does|is) DOCTOR (?:work|working|available|in|seeing patients)",
+        r"what (?:days|times|hours) (?:does|is) DOCTOR (?:work|working|available|in)",
+        r"when can i see DOCTOR",
+    ],
+    "emergency": [
+        r"(?:is|does) DOCTOR (?:available for|take|handle|offer|do) emergenc(?:y|ies)(?: consultations?| cases| calls)?",
+        r"is DOCTOR on[- ]call",
+        r"when is DOCTOR (?:available for emergenc(?:y|ies)(?: consultations?)?|on[- ]call)",
+        r"what is DOCTOR emergency (?:consultation )?(?:availability|hours|schedule)",
+    ],
+    "languages": [
+        r"(?:what|which) languages? (?:does|can) DOCTOR speak",
+        r"(?:what|which) languages? (?:is|are) spoken by DOCTOR",
+    ],
+    "phone": [
+        r"what is DOCTOR (?:phone|contact|telephone)(?: number)?",
+        r"what is the (?:phone|contact|telephone)(?: number)? (?:of|for) DOCTOR",
+        r"how (?:can|do) i (?:contact|call|reach) DOCTOR",
+    ],
+    "specialization": [
+        r"what is DOCTOR (?:specialty|speciality|specialization|specialisation|field|area of expertise)",
+        r"what does DOCTOR speciali[sz]e in",
+    ],
+}
+_CLAUSE_RES = {intent: [re.compile(rf"^{pattern}$") for pattern in patterns]
+               for intent, patterns in _CLAUSE_PATTERNS.items()}
+_POLITE_PREFIX_RE = re.compile(r"^(?:please )?(?:(?:can|could) you (?:please )?)?tell me |^please ")
+# "Which doctors work on Saturday at 8 AM?" / "Who speaks French?"
+_LIST_SUBJECT = r"(?:(?:which|what) doctors?|who)"
+_WEEKDAY_LIST_RE = re.compile(
+    rf"^{_LIST_SUBJECT} (?:works?|is working|are working|is available|are available) on "
+    rf"(?P<day>{'|'.join(WEEKDAYS)})s?(?: at (?P<time>[0-9: .apm]+))?$"
+)
+_LANGUAGE_LIST_RE = re.compile(rf"^{_LIST_SUBJECT} (?:speaks?|can speak) (?P<language>[a-z]+)$")
+
+_FIELDS = {
+    "contact number": "phone",
+    "phone": "phone",
+    "specialization": "specialization",
+    "working hours": "hours",
+    "patient consultations": "hours",
+    "clinic hours": "hours",
+    "emergency consultations": "emergency",
+    "languages": "languages",
+    "surgery days": "surgery_days",
+    "expertise": "expertise",
+}
+
+
+def parse_doctor_records(text: str, source: str) -> List[Dict[str, Any]]:
+    """Extract the doctor records of a directory file.
+
+    A record starts at a numbered or markdown "Dr. Name - Title" header and ends at
+    the next heading or unindented line that is neither a field nor a list item.
+    """
+    records = []
+    record = None
+    field = None
+    for line in text.splitlines():
+        header = _HEADER_RE.match(line)
+        if header:
+            record = {"name": header.group(1), "title": header.group(2), "source": source,
+                      "languages": [], "expertise": []}
+            records.append(record)
+            field = None
+            continue
+        if record is None or not line.strip():
+            continue
+        if line.startswith("#") or not (line[0].isspace() or line.startswith(("**", "-"))):
+            record = None
+            continue
+
+        item = _ITEM_RE.match(line)
+        if item and field == "expertise":
+            record["expertise"].append(item.group(1))
+            continue
+        match = _FIELD_RE.match(line)
+        if not match:
+            continue
+        field = _FIELDS.get(match.group(1).strip().lower())
+        value = match.group(2)
+        if field == "languages":
+            record["languages"] = [lang.strip() for lang in re.split(r",|\band\b", value) if lang.strip()]
+        elif field == "expertise":
+            if value:
+                record["expertise"].append(value)
+        elif field is not None and value:
+            record[field] = value
+    return records
+
+
+def _to_minutes(hour: str, minute: str, meridiem: str) -> int:
+    hour_value = int(hour) % 12 + (12 if meridiem.upper() == "PM" else 0)
+    return hour_value * 60 + int(minute)
+
+
+def parse_time(text: str) -> Optional[dtime]:
+    """The first time of day mentioned in a question, if any."""
+    match = _QUESTION_TIME_RE.search(text)
+    if not match:
+        return None
+    if match.group(3):
+        minutes = _to_minutes(match.group(1), match.group(2) or "0", match.group(3) + "M")
+    else:
+        minutes = int(match.group(4)) * 60 + int(match.group(5))
+    if minutes >= 24 * 60 or int(match.group(2) or match.group(5) or 0) >= 60:
+        return None
+    return dtime(minutes // 60, minutes % 60)
+
+
+def parse_hours(hours: str) -> Dict[int, Tuple[int, int]]:
+    """Parse "Monday-Friday, 8:00 AM - 4:00 PM" into {weekday: (start, end)} in minutes."""
+    time_range = _TIME_RANGE_RE.search(hours)
+    if not time_range:
+        return {}
+    start = _to_minutes(*time_range.group(1, 2, 3))
+    end = _to_minutes(*time_range.group(4, 5, 6))
+    day_text = hours[:time_range.start()].lower()
+
+    days: Set[int] = set()
+    for first, last in re.findall(r"([a-z]+day)\s*-\s*([a-z]+day)", day_text):
+        if first in WEEKDAYS and last in WEEKDAYS:
+            i, j = WEEKDAYS.index(first), WEEKDAYS.index(last)
+            # Ranges may wrap around the week, e.g. "Saturday-Monday"
+            days.update((i + offset) % 7 for offset in range((j - i) % 7 + 1))
+    for day in re.findall(r"[a-z]+day", day_text):
+        if day in WEEKDAYS:
+            days.add(WEEKDAYS.index(day))
+    return {day: (start, end) for day in days}
+
+
+class DoctorDirectory:
+    """Indexed in-memory table of doctor records with lookup by name, specialty,
+    language and weekday/time."""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.doctors: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            self._merge(record)
+
+        self._by_name: Dict[str, Set[str]] = {}
+        self._by_specialty: Dict[str, Set[str]] = {}
+        self._by_language: Dict[str, Set[str]] = {}
+        self._by_weekday: Dict[int, Set[str]] = {}
+        for key, doctor in self.doctors.items():
+            doctor["schedule"] = parse_hours(doctor.get("hours", ""))
+            for token in self._tokens(doctor["name"]) - {"dr"}:
+                self._by_name.setdefault(token, set()).add(key)
+            for token in self._tokens(f"{doctor['title']} {doctor.get('specialization', '')}"):
+                self._by_specialty.setdefault(token, set()).add(key)
+            for language in doctor["languages"]:
+                self._by_language.setdefault(language.lower(), set()).add(key)
+            for day in doctor["schedule"]:
+                self._by_weekday.setdefault(day, set()).add(key)
+
+    def __len__(self) -> int:
+        return len(self.doctors)
+
+    @staticmethod
+    def _tokens(text: str) -> Set[str]:
+        return set(re.findall(r"[a-z]+", text.lower()))
+
+    def _merge(self, record: Dict[str, Any]):
+        """Merge records of the same doctor found in several files."""
+        key = record["name"].lower()
+        doctor = self.doctors.get(key)
+        if doctor is None:
+            doctor = {"name": record["name"], "title": record["title"], "languages": [],
+                      "expertise": [], "sources": []}
+            self.doctors[key] = doctor
+        for field, value in record.items():
+            if field in ("name", "title", "source"):
+                continue
+            if field in ("languages", "expertise"):
+                doctor[field].extend(v for v in value if v not in doctor[field])
+            elif field not in doctor:
+                doctor[field] = value
+        if record["source"] not in doctor["sources"]:
+            doctor["sources"].append(record["source"])
+
+    def find_by_name(self, text: str) -> List[Dict[str, Any]]:
+        """Doctors whose name shares the most tokens with the text."""
+        counts: Dict[str, int] = {}
+        for token in self._tokens(text):
+            for key in self._by_name.get(token, ()):
+                counts[key] = counts.get(key, 0) + 1
+        if not counts:
+            return []
+        best = max(counts.values())
+        return [self.doctors[key] for key, count in counts.items() if count == best]
+
+    def find_by_specialty(self, term: str) -> List[Dict[str, Any]]:
+        """Doctors whose title or specialization contains every word of the term."""
+        keys = None
+        for token in self._tokens(term):
+            matches = self._by_specialty.get(token, set())
+            keys = matches if keys is None else keys & matches
+        return [self.doctors[key] for key in sorted(keys or ())]
+
+    def find_by_language(self, language: str) -> List[Dict[str, Any]]:
+        return [self.doctors[key] for key in sorted(self._by_language.get(language.lower(), ()))]
+
+    def find_available(self, weekday: int, at: Optional[dtime] = None) -> List[Dict[str, Any]]:
+        """Doctors working on a weekday (0 = Monday), optionally at a given time."""
+        doctors = []
+        for key in sorted(self._by_weekday.get(weekday, ())):
+            start, end = self.doctors[key]["schedule"][weekday]
+            if at is None or start <= at.hour * 60 + at.minute < end:
+                doctors.append(self.doctors[key])
+        return doctors
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        text = question.lower().replace("\u2019", "'")
+        text = re.sub(r"[?!.,;]+\s*$", "", text.strip())
+        return " ".join(text.split())
+
+    def _mask_doctor(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Replace the one "Dr. <name>" mention of a question by DOCTOR and return the
+        doctors it names. Without exactly one mention, the text is returned as is."""
+        mentions = list(re.finditer(r"\bdr\b\.?((?:\s+[a-z]+)+)", text))
+        if len(mentions) != 1:
+            return text, []
+        mention = mentions[0]
+        # Only the words that are part of a doctor's name, the rest of the question follows
+        words = mention.group(1).split()
+        name_words = []
+        for word in words:
+            if word not in self._by_name:
+                break
+            name_words.append(word)
+        if not name_words:
+            return text, []
+        name_end = mention.start(1) + mention.group(1).index(name_words[-1]) + len(name_words[-1])
+        rest = re.sub(r"^'s?\b|^'", "", text[name_end:])
+        return f"{text[:mention.start()]}DOCTOR{rest}", self.find_by_name(" ".join(name_words))
+
+    @staticmethod
+    def _clause_intent(clause: str) -> Optional[str]:
+        clause = clause.strip()
+        if _POLITE_PREFIX_RE.match(clause):
+            clause = _POLITE_PREFIX_RE.sub("", clause)
+            # "Tell me Dr. X's phone number" asks the same as "What is Dr. X's phone number"
+            if not re.match(r"(?:what|which|when|how|is|does) ", clause):
+                clause = f"what is {clause}"
+        for intent, patterns in _CLAUSE_RES.items():
+            if any(pattern.match(clause) for pattern in patterns):
+                return intent
+        return None
+
+    def answer(self, question: str) -> Optional[Dict[str, Any]]:
+        """Answer a simple factual question from the table, or None if it needs the LLM.
+
+        Only questions matching one of the fixed question patterns as a whole are
+        answered, everything else goes to retrieval and the LLM.
+        """
+        text = self._normalize(question)
+
+        weekday_list = _WEEKDAY_LIST_RE.match(text)
+        if weekday_list:
+            day = WEEKDAYS.index(weekday_list.group("day"))
+            at = None
+            if weekday_list.group("time"):
+                at = parse_time(weekday_list.group("time"))
+                if at is None:
+                    return None
+            name = WEEKDAYS[day].title()
+            criterion = f"work on {name} at {at.strftime('%I:%M %p').lstrip('0')}" if at else f"work on {name}"
+            return self._list_answer(criterion, self.find_available(day, at))
+        language_list = _LANGUAGE_LIST_RE.match(text)
+        if language_list:
+            language = language_list.group("language")
+            return self._list_answer(f"speak {language.title()}", self.find_by_language(language))
+
+        masked, doctors = self._mask_doctor(text)
+        if len(doctors) != 1:
+            return None
+        doctor = doctors[0]
+
+        # "Which languages does Dr. X speak and what is his specialty?"
+        clauses = re.split(r",? and |, ", masked)
+        clauses = [clauses[0]] + [re.sub(r"\b(?:his|her|their|he|she|they)\b", "DOCTOR", clause)
+                                  for clause in clauses[1:]]
+        intents = [self._clause_intent(clause) for clause in clauses]
+        if not intents or None in intents:
+            return None
+
+        sentences = []
+        for intent in dict.fromkeys(intents):
+            if intent == "hours" and doctor.get("hours"):
+                sentences.append(f"{doctor['name']}'s working hours: {doctor['hours']}.")
+            elif intent == "emergency" and doctor.get("emergency"):
+                sentences.append(f"Emergency consultations with {doctor['name']}: {doctor['emergency']}.")
+            elif intent == "languages" and doctor["languages"]:
+                sentences.append(f"{doctor['name']} speaks {', '.join(doctor['languages'])}.")
+            elif intent == "phone" and doctor.get("phone"):
+                sentences.append(f"You can contact {doctor['name']} at {doctor['phone']}.")
+            elif intent == "specialization" and doctor.get("specialization"):
+                sentences.append(f"{doctor['name']} is our {doctor['title']}, specializing in {doctor['specialization']}.")
+            else:
+                # The record lacks the field, let the LLM search the full context
+                return None
+        return {
+            "answer": " ".join(sentences),
+            "sources": [{"source": source} for source in doctor["sources"]]
+        }
+
+    @staticmethod
+    def _list_answer(criterion: str, doctors: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not doctors:
+            return None
+        names = [f"{d['name']} ({d['title']})" for d in doctors]
+        sources = []
+        for doctor in doctors:
+            sources.extend({"source": s} for s in doctor["sources"] if {"source": s} not in sources)
+        return {"answer": f"These doctors {criterion}: {'; '.join(names)}.", "sources": sources}
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store: (model name, text hash) -> float32 vector.
+
+    Vectors are kept in a SQLite file as raw float32 bytes, with an in-memory LRU of
+    the most recently used ones in front of it. One file can hold several models.
+    The file holds at most ``max_entries`` vectors (0 for no limit): beyond that, the
+    ones least recently read from or written to disk are deleted.
+    """
+
+    # Fraction of max_entries kept after pruning, so pruning does not run on every write
+    _PRUNE_TO = 0.9
+
+    def __init__(self, path: str, model_name: str, max_memory_entries: int = 10000, max_entries: int = 0):
+        self.path = path
+        self.model_name = model_name
+        self.max_memory_entries = max_memory_entries
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        # Files created before pruning lack the last-use time
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")]
+        if "used_at" not in columns:
+            self._db.execute("ALTER TABLE embeddings ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_by_use ON embeddings (used_at)")
+        self._db.commit()
+        self._disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).digest()
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        """Add a vector to the LRU front. Caller holds the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors of the texts, None for texts not embedded yet."""
+        keys = [self.key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            missing: Dict[bytes, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[i] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            found = set()
+            keys_to_load = list(missing)
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(keys_to_load), 500):
+                chunk = keys_to_load[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    found.add(key)
+                    for i in missing[key]:
+                        vectors[i] = vector
+            for key, positions in missing.items():
+                if key in found:
+                    self.disk_hits += len(positions)
+                else:
+                    self.misses += len(positions)
+            if found and self.max_entries:
+                # Memory hits are not recorded, the disk order is approximately LRU
+                now = time.time()
+                self._db.executemany("UPDATE embeddings SET used_at = ? WHERE key = ?", [(now, key) for key in found])
+                self._db.commit()
+        return vectors
+
+    def put_many(self, texts: List[str], vectors: List[Any]):
+        """Store the vectors of the texts."""
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                key = self.key(text)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes(), now))
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector, used_at) VALUES (?, ?, ?)", rows)
+            # Upper bound: a replaced key counts as a new row until the next prune recounts
+            self._disk_entries += self._db.total_changes - before
+            if self.max_entries and self._disk_entries > self.max_entries:
+                self._prune()
+            self._db.commit()
+
+    def _prune(self):
+        """Delete the least recently used vectors down to a fraction of max_entries. Caller holds the lock."""
+        self._disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._disk_entries - int(self.max_entries * self._PRUNE_TO)
+        if self._disk_entries <= self.max_entries or excess <= 0:
+            return
+        self._db.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY used_at LIMIT ?)", (excess,)
+        )
+        self._disk_entries -= excess
+        self.evictions += excess
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "path": self.path,
+                "model": self.model_name,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only embeds texts missing from an EmbeddingCache."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Embed each distinct missing text once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            embedded = dict(zip(unique, self.embeddings.embed_documents(unique)))
+            self.cache.put_many(unique, [embedded[text] for text in unique])
+            for i in missing:
+                vectors[i] = embedded[texts[i]]
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Models may embed questions differently from documents, so these are not cached
+        return self.embeddings.embed_query(text)
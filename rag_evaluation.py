@@ -1,12 +1,15 @@
 import os
 import json
+import argparse
+import itertools
 import numpy as np
-from typing import List, Dict, Any
-from sklearn.metrics.pairwise import cosine_similarity
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
 from rouge import Rouge
 from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
 import nltk
-from langchain_huggingface import HuggingFaceEmbeddings
+import rag_config
+from rag_models import registry
 from rag_system import RAGSystem
 
 # Download NLTK data
@@ -15,16 +18,73 @@ try:
 except:
     pass
 
+ROUGE_KEYS = ("rouge-1", "rouge-2", "rouge-l")
+
+
+class RunningScores:
+    """Incremental means of the per-item metrics of a streaming evaluation."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.sums = {"exact_match": 0.0, "semantic_similarity": 0.0, "bleu": 0.0, "retrieval_precision": 0.0}
+        self.rouge_count = 0
+        self.rouge_sums = {key: {"f": 0.0, "p": 0.0, "r": 0.0} for key in ROUGE_KEYS}
+
+    def add(self, record: Dict[str, Any]):
+        """Add the scores of one per-item result record."""
+        self.count += 1
+        if "error" in record:
+            self.errors += 1
+        for metric in self.sums:
+            self.sums[metric] += float(record[metric])
+        if record.get("rouge"):
+            self.rouge_count += 1
+            for key in ROUGE_KEYS:
+                for part in ("f", "p", "r"):
+                    self.rouge_sums[key][part] += record["rouge"][key][part]
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate scores in the same shape as evaluate_all, without the details."""
+        mean = {metric: total / self.count if self.count else 0 for metric, total in self.sums.items()}
+        rouge = {
+            key: {part: total / self.rouge_count if self.rouge_count else 0 for part, total in parts.items()}
+            for key, parts in self.rouge_sums.items()
+        }
+        results = {
+            "exact_match": {"score": mean["exact_match"]},
+            "semantic_similarity": {"score": mean["semantic_similarity"]},
+            "rouge": rouge,
+            "bleu": {"score": mean["bleu"]},
+            "retrieval_precision": {"score": mean["retrieval_precision"]},
+            "count": self.count,
+            "errors": self.errors
+        }
+        results["overall"] = (
+            mean["exact_match"] * 0.1 +
+            mean["semantic_similarity"] * 0.3 +
+            rouge["rouge-l"]["f"] * 0.3 +
+            mean["bleu"] * 0.1 +
+            mean["retrieval_precision"] * 0.2
+        )
+        return results
+
+
 class RAGEvaluator:
-    def __init__(self, rag_system: RAGSystem, ground_truth_file: str = "evaluation/ground_truth.json"):
-        """Initialize the RAG evaluator with a RAG system and ground truth data."""
+    def __init__(self, rag_system: RAGSystem, ground_truth_file: str = "evaluation/ground_truth.json",
+                 max_workers: int = rag_config.EVAL_WORKERS):
+        """Initialize the RAG evaluator with a RAG system, ground truth data and the number
+        of questions answered concurrently."""
         self.rag_system = rag_system
+        self.max_workers = max_workers
         self.ground_truth_file = ground_truth_file
-        self.ground_truth = self._load_ground_truth()
+        # JSONL ground truth is streamed by iter_ground_truth() instead of loaded up front
+        self.streaming = ground_truth_file.endswith(".jsonl")
+        self.ground_truth = None if self.streaming else self._load_ground_truth()
         self.rouge = Rouge()
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        # Shared with the RAG system through the process-wide model registry; reference
+        # answers are embedded once across runs through the embedding cache
+        self.embeddings = registry.cached_embeddings(rag_config.EMBEDDING_MODEL)
     
     def _load_ground_truth(self) -> List[Dict[str, str]]:
         """Load ground truth data from a JSON file."""
@@ -55,14 +115,69 @@ class RAGEvaluator:
         with open(self.ground_truth_file, 'r') as f:
             return json.load(f)
     
+    def iter_ground_truth(self) -> Iterator[Dict[str, str]]:
+        """Yield the ground-truth items one at a time, reading JSONL files lazily."""
+        if self.ground_truth is not None:
+            yield from self.ground_truth
+            return
+        with open(self.ground_truth_file, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    @staticmethod
+    def item_key(item: Dict[str, Any]) -> str:
+        """Identity of a ground-truth item for resuming: its "id", or else its question."""
+        return str(item.get("id", item["question"]))
+    
+    def _answer(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one ground-truth question; a failed query is recorded with an empty answer and its error."""
+        try:
+            # Bypass the answer cache so every question is really generated
+            response = self.rag_system.query(item["question"], use_cache=False)
+            actual, sources, error = response["answer"], response["sources"], None
+        except Exception as e:
+            actual, sources, error = "", [], str(e)
+        result = {
+            "question": item["question"],
+            "expected": item["answer"],
+            "actual": actual,
+            "sources": sources
+        }
+        if "id" in item:
+            result["id"] = item["id"]
+        if error:
+            result["error"] = error
+        return result
+    
+    def _similarities(self, answers: List[Dict[str, Any]]) -> np.ndarray:
+        """Cosine similarity of each expected/actual pair, from one batched embedding call."""
+        vectors = np.asarray(self.embeddings.embed_documents(
+            [item["expected"] for item in answers] + [item["actual"] for item in answers]
+        ), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        return np.einsum("ij,ij->i", vectors[:len(answers)], vectors[len(answers):])
+    
+    def collect_answers(self) -> List[Dict[str, Any]]:
+        """Answer every ground-truth question once, in a bounded pool of worker threads.
+
+        Every metric is computed from this shared answer set. Answers are returned in
+        ground-truth order.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._answer, self.iter_ground_truth()))
+
     def evaluate_all(self) -> Dict[str, Any]:
-        """Run all evaluations and return combined results."""
+        """Answer every question once and run all evaluations on the answers."""
+        answers = self.collect_answers()
         results = {
-            "exact_match": self.evaluate_exact_match(),
-            "semantic_similarity": self.evaluate_semantic_similarity(),
-            "rouge": self.evaluate_rouge(),
-            "bleu": self.evaluate_bleu(),
-            "retrieval_precision": self.evaluate_retrieval_precision()
+            "exact_match": self.evaluate_exact_match(answers),
+            "semantic_similarity": self.evaluate_semantic_similarity(answers),
+            "rouge": self.evaluate_rouge(answers),
+            "bleu": self.evaluate_bleu(answers),
+            "retrieval_precision": self.evaluate_retrieval_precision(answers)
         }
         
         # Calculate overall score (weighted average)
@@ -77,18 +192,15 @@ class RAGEvaluator:
         results["overall"] = overall
         return results
     
-    def evaluate_exact_match(self) -> Dict[str, Any]:
+    def evaluate_exact_match(self, answers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Evaluate exact match accuracy."""
+        answers = self.collect_answers() if answers is None else answers
         correct = 0
         results = []
         
-        for item in self.ground_truth:
-            question = item["question"]
-            expected = item["answer"].lower().strip()
-            
-            # Get RAG response
-            response = self.rag_system.query(question)
-            actual = response["answer"].lower().strip()
+        for item in answers:
+            expected = item["expected"].lower().strip()
+            actual = item["actual"].lower().strip()
             
             # Check exact match
             is_match = expected == actual
@@ -96,68 +208,51 @@ class RAGEvaluator:
                 correct += 1
             
             results.append({
-                "question": question,
+                "question": item["question"],
                 "expected": expected,
                 "actual": actual,
                 "match": is_match
             })
         
-        score = correct / len(self.ground_truth) if self.ground_truth else 0
+        score = correct / len(answers) if answers else 0
         return {
             "score": score,
             "details": results
         }
     
-    def evaluate_semantic_similarity(self) -> Dict[str, Any]:
+    def evaluate_semantic_similarity(self, answers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Evaluate semantic similarity between expected and actual answers."""
-        similarities = []
-        results = []
+        answers = self.collect_answers() if answers is None else answers
+        if not answers:
+            return {"score": 0, "details": []}
         
-        for item in self.ground_truth:
-            question = item["question"]
-            expected = item["answer"]
-            
-            # Get RAG response
-            response = self.rag_system.query(question)
-            actual = response["answer"]
-            
-            # Get embeddings
-            expected_embedding = self.embeddings.embed_query(expected)
-            actual_embedding = self.embeddings.embed_query(actual)
-            
-            # Calculate cosine similarity
-            similarity = cosine_similarity(
-                [expected_embedding], 
-                [actual_embedding]
-            )[0][0]
-            
-            similarities.append(similarity)
-            results.append({
-                "question": question,
-                "expected": expected,
-                "actual": actual,
-                "similarity": similarity
-            })
+        similarities = self._similarities(answers)
         
-        avg_similarity = np.mean(similarities) if similarities else 0
+        results = [
+            {
+                "question": item["question"],
+                "expected": item["expected"],
+                "actual": item["actual"],
+                "similarity": float(similarity)
+            }
+            for item, similarity in zip(answers, similarities)
+        ]
         return {
-            "score": avg_similarity,
+            "score": float(similarities.mean()),
             "details": results
         }
     
-    def evaluate_rouge(self) -> Dict[str, Any]:
+    def evaluate_rouge(self, answers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Evaluate using ROUGE metrics."""
+        answers = self.collect_answers() if answers is None else answers
         all_expected = []
         all_actual = []
         results = []
         
-        for item in self.ground_truth:
+        for item in answers:
             question = item["question"]
-            expected = item["answer"]
-            
-            # Get RAG response
-            response = self.rag_system.query(question)
-            actual = response["answer"]
+            expected = item["expected"]
+            actual = item["actual"]
             
             all_expected.append(expected)
             all_actual.append(actual)
@@ -201,19 +296,17 @@ class RAGEvaluator:
                 "error": "Failed to calculate average ROUGE scores"
             }
     
-    def evaluate_bleu(self) -> Dict[str, Any]:
+    def evaluate_bleu(self, answers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Evaluate using BLEU score."""
+        answers = self.collect_answers() if answers is None else answers
         scores = []
         results = []
         smoothing = SmoothingFunction().method1
         
-        for item in self.ground_truth:
+        for item in answers:
             question = item["question"]
-            expected = item["answer"]
-            
-            # Get RAG response
-            response = self.rag_system.query(question)
-            actual = response["answer"]
+            expected = item["expected"]
+            actual = item["actual"]
             
             # Tokenize
             reference = [expected.split()]
@@ -243,18 +336,15 @@ class RAGEvaluator:
             "details": results
         }
     
-    def evaluate_retrieval_precision(self) -> Dict[str, Any]:
+    def evaluate_retrieval_precision(self, answers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Evaluate retrieval precision by checking if the correct documents were retrieved."""
         # This is a simplified version - ideally you would have ground truth for which documents should be retrieved
+        answers = self.collect_answers() if answers is None else answers
         results = []
         retrieval_scores = []
         
-        for item in self.ground_truth:
-            question = item["question"]
-            
-            # Get RAG response with source documents
-            response = self.rag_system.query(question)
-            sources = response["sources"]
+        for item in answers:
+            sources = item["sources"]
             
             # For simplicity, we'll just check if any sources were retrieved
             # In a real evaluation, you would check if the correct sources were retrieved
@@ -262,7 +352,7 @@ class RAGEvaluator:
             retrieval_scores.append(retrieval_score)
             
             results.append({
-                "question": question,
+                "question": item["question"],
                 "sources": sources,
                 "score": retrieval_score
             })
@@ -273,16 +363,115 @@ class RAGEvaluator:
             "details": results
         }
 
+    def score_answers(self, answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Per-item result records with every metric, for a batch of answers."""
+        if not answers:
+            return []
+        similarities = self._similarities(answers)
+        smoothing = SmoothingFunction().method1
+        records = []
+        for item, similarity in zip(answers, similarities):
+            record = dict(item)
+            record["exact_match"] = float(item["expected"].lower().strip() == item["actual"].lower().strip())
+            record["semantic_similarity"] = float(similarity)
+            try:
+                record["rouge"] = self.rouge.get_scores(item["actual"], item["expected"])[0]
+            except:
+                record["rouge"] = None
+            try:
+                record["bleu"] = sentence_bleu([item["expected"].split()], item["actual"].split(),
+                                               smoothing_function=smoothing)
+            except:
+                record["bleu"] = 0.0
+            record["retrieval_precision"] = 1.0 if item["sources"] else 0.0
+            records.append(record)
+        return records
+    
+    @staticmethod
+    def _read_checkpoint(results_file: str, scores: RunningScores) -> set:
+        """Keys of the items already in a results file, adding their scores to ``scores``.
+
+        A partial last line left by a crash is cut off so new records append cleanly.
+        """
+        done = set()
+        if not os.path.exists(results_file):
+            return done
+        with open(results_file, 'rb+') as f:
+            data_end = 0
+            for line in iter(f.readline, b''):
+                if not line.endswith(b'\n'):
+                    break
+                record = json.loads(line)
+                done.add(RAGEvaluator.item_key(record))
+                scores.add(record)
+                data_end = f.tell()
+            f.truncate(data_end)
+        return done
+    
+    def evaluate_stream(self, results_file: str = "evaluation/results.jsonl",
+                        summary_file: str = "evaluation/results_summary.json",
+                        resume: bool = False, batch_size: int = 32) -> Dict[str, Any]:
+        """Evaluate the ground truth in batches, appending one result record per item.
+
+        Only one batch of items and answers is held in memory. After every batch the
+        records are flushed and the aggregate summary is rewritten, so an interrupted
+        run can continue with ``resume=True``, which skips items already in the
+        results file.
+        """
+        scores = RunningScores()
+        done = self._read_checkpoint(results_file, scores) if resume else set()
+        if done:
+            print(f"Resuming after {len(done)} scored items")
+        os.makedirs(os.path.dirname(results_file) or ".", exist_ok=True)
+        
+        def write_summary():
+            tmp_path = summary_file + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(scores.summary(), f, indent=2)
+            os.replace(tmp_path, summary_file)
+        
+        pending = (item for item in self.iter_ground_truth() if self.item_key(item) not in done)
+        with open(results_file, 'a' if resume else 'w') as out, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                batch = list(itertools.islice(pending, batch_size))
+                if not batch:
+                    break
+                for record in self.score_answers(list(executor.map(self._answer, batch))):
+                    out.write(json.dumps(record) + "\n")
+                    scores.add(record)
+                out.flush()
+                write_summary()
+                print(f"Scored {scores.count} items")
+        
+        write_summary()
+        return scores.summary()
+
 def main():
+    parser = argparse.ArgumentParser(description="Evaluate the RAG system against ground-truth answers")
+    parser.add_argument("--ground-truth", default="evaluation/ground_truth.json",
+                        help="Ground truth as a JSON list, or JSONL to stream it")
+    parser.add_argument("--results", default="evaluation/results.jsonl",
+                        help="Per-item results file of a JSONL (streaming) evaluation")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip items already in the results file of a streaming evaluation")
+    parser.add_argument("--workers", type=int, default=rag_config.EVAL_WORKERS,
+                        help="Questions answered concurrently")
+    args = parser.parse_args()
+
     # Initialize RAG system
     rag_system = RAGSystem()
     rag_system.initialize()
     
     # Initialize evaluator
-    evaluator = RAGEvaluator(rag_system)
+    evaluator = RAGEvaluator(rag_system, args.ground_truth, max_workers=args.workers)
     
     # Run evaluation
-    results = evaluator.evaluate_all()
+    if evaluator.streaming:
+        summary_file = os.path.splitext(args.results)[0] + "_summary.json"
+        results = evaluator.evaluate_stream(args.results, summary_file, resume=args.resume)
+    else:
+        results = evaluator.evaluate_all()
     
     # Print results
     print("\n=== RAG System Evaluation Results ===\n")
@@ -294,6 +483,16 @@ def main():
     print(f"BLEU Score: {results['bleu']['score']:.4f}")
     print(f"Retrieval Precision: {results['retrieval_precision']['score']:.4f}")
     
+    cache = registry.embedding_cache(rag_config.EMBEDDING_MODEL)
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"\nEmbedding cache: {cache_stats['hit_rate']:.1%} hit rate "
+              f"({cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, {cache_stats['misses']} misses)")
+
+    if evaluator.streaming:
+        print(f"\nPer-item results saved to {args.results}, summary to {summary_file}")
+        return
+    
     # Save detailed results
     os.makedirs("evaluation", exist_ok=True)
     with open("evaluation/results.json", "w") as f:
@@ -302,4 +501,4 @@ def main():
     print(f"\nDetailed results saved to evaluation/results.json")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
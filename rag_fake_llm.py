@@ -0,0 +1,61 @@
+import hashlib
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+
+class FakeLLM(LLM):
+    """Deterministic stand-in for OllamaLLM, used for benchmarks on machines without Ollama.
+
+    Waits ``latency_ms`` before the first token and then emits ``tokens_per_sec``
+    tokens per second. The answer is built from words of the prompt's context, so the
+    same prompt always gets the same answer and its length follows the retrieval.
+    """
+
+    latency_ms: float = 200.0
+    tokens_per_sec: float = 50.0
+    max_tokens: int = 64
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _tokens(self, prompt: str) -> List[str]:
+        context = prompt.split("Context:", 1)[-1].split("Patient Question:", 1)[0]
+        words = re.findall(r"\S+", context)
+        if not words:
+            return ["I", "apologize,", "but", "I", "don't", "have", "enough", "information."]
+        # Start at a prompt-dependent offset so different questions get different answers
+        start = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % len(words)
+        count = min(self.max_tokens, len(words))
+        return [words[(start + i) % len(words)] for i in range(count)]
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        tokens = self._tokens(prompt)
+        time.sleep(self.latency_ms / 1000.0)
+        for i, token in enumerate(tokens):
+            if i and self.tokens_per_sec > 0:
+                time.sleep(1.0 / self.tokens_per_sec)
+            chunk = GenerationChunk(text=token if i == 0 else " " + token)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        return "".join(chunk.text for chunk in self._stream(prompt, stop, run_manager, **kwargs))
@@ -0,0 +1,191 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from langchain_community.document_loaders import TextLoader
+
+# Embedding model of a pool worker process, loaded once by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    """Load the sentence-transformer once per worker process."""
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _embed_in_worker(texts: List[str]) -> List[List[float]]:
+    """Embed one batch inside a worker process, the same way HuggingFaceEmbeddings does."""
+    texts = [text.replace("\n", " ") for text in texts]
+    return _worker_model.encode(texts, show_progress_bar=False).tolist()
+
+
+def chunk_ids(source: str, file_hash: str, count: int) -> List[str]:
+    """Deterministic chunk IDs, so re-adding a file after a crash overwrites instead of duplicating."""
+    return [f"{source}:{file_hash[:16]}:{i}" for i in range(count)]
+
+
+@dataclass
+class ChunkBatch:
+    """A fixed-size group of chunks that is embedded and upserted together."""
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    # (source, chunk IDs, extracted data) of files whose last chunk is in this or an earlier batch
+    finished_files: List[Tuple[str, List[str], Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class IngestionPipeline:
+    """Stream files into chunks into embedding batches and upsert them into a vector store.
+
+    Only one file and at most ``2 * workers`` batches are held in memory at a time,
+    so memory stays flat no matter how many files are ingested.
+    """
+
+    def __init__(
+        self,
+        text_splitter: Any,
+        embeddings: Any,
+        model_name: str,
+        batch_size: int = 64,
+        workers: int = 0,
+        progress_interval: float = 5.0,
+        extract: Optional[Callable[[str, str], Any]] = None,
+        cache: Optional[Any] = None,
+    ):
+        """``extract(text, source)`` is called once per loaded file, its result is
+        handed to ``on_files_done`` together with the file's chunk IDs. With an
+        EmbeddingCache as ``cache``, only chunks missing from it are embedded."""
+        self.text_splitter = text_splitter
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self.extract = extract
+        self.cache = cache
+
+    def iter_batches(self, files: Dict[str, str]) -> Iterator[ChunkBatch]:
+        """Lazily load and split each file and group its chunks into batches."""
+        batch = ChunkBatch()
+        for source, file_hash in files.items():
+            documents = TextLoader(source).load()
+            extracted = None
+            if self.extract is not None:
+                extracted = self.extract("".join(doc.page_content for doc in documents), source)
+            chunks = self.text_splitter.split_documents(documents)
+            ids = chunk_ids(source, file_hash, len(chunks))
+            for chunk_id, chunk in zip(ids, chunks):
+                batch.ids.append(chunk_id)
+                batch.texts.append(chunk.page_content)
+                batch.metadatas.append(chunk.metadata)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = ChunkBatch()
+            batch.finished_files.append((source, ids, extracted))
+        if batch.ids or batch.finished_files:
+            yield batch
+
+    def _submit(self, executor: Optional[ProcessPoolExecutor], texts: List[str]) -> Future:
+        """Start embedding texts, in the pool if there is one."""
+        if not texts:
+            future: Future = Future()
+            future.set_result([])
+            return future
+        if executor is not None:
+            return executor.submit(_embed_in_worker, texts)
+        future = Future()
+        future.set_result(self.embeddings.embed_documents(texts))
+        return future
+
+    def _start(self, executor: Optional[ProcessPoolExecutor], batch: ChunkBatch) -> Tuple[Future, List[Any]]:
+        """Look the batch up in the cache and start embedding the chunks it misses.
+
+        Returns the future of the missing vectors and the cached vectors, None where missing.
+        """
+        cached: List[Any] = [None] * len(batch.texts)
+        if self.cache is not None and batch.texts:
+            cached = self.cache.get_many(batch.texts)
+        missing = [text for text, vector in zip(batch.texts, cached) if vector is None]
+        return self._submit(executor, missing), cached
+
+    def _finish(self, batch: ChunkBatch, future: Future, cached: List[Any]) -> List[List[float]]:
+        """Merge the cached and freshly embedded vectors of a batch, caching the new ones."""
+        embedded = future.result()
+        if self.cache is not None and embedded:
+            self.cache.put_many([text for text, vector in zip(batch.texts, cached) if vector is None], embedded)
+        fresh = iter(embedded)
+        return [next(fresh) if vector is None else vector.tolist() for vector in cached]
+
+    def run(
+        self,
+        files: Dict[str, str],
+        upsert: Callable[[List[str], List[str], List[Dict[str, Any]], List[List[float]]], None],
+        on_files_done: Callable[[List[Tuple[str, List[str], Any]]], None],
+    ) -> Dict[str, Any]:
+        """Embed and upsert every chunk of ``files`` (path -> content hash).
+
+        Batches are upserted in submission order, so ``on_files_done`` is only called
+        for a file once all of its chunks are in the vector store.
+        """
+        executor = None
+        if self.workers > 0:
+            # Spawned, not forked: ingestion runs on the background init thread, and forking a
+            # process with other threads and torch already running can deadlock the workers
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name,),
+            )
+        max_in_flight = max(1, self.workers * 2)
+        in_flight: Deque[Tuple[ChunkBatch, Future, List[Any]]] = deque()
+
+        stats = {"files": 0, "chunks": 0, "cached_chunks": 0, "batches": 0, "seconds": 0.0, "chunks_per_sec": 0.0}
+        start = time.perf_counter()
+        last_report = start
+
+        def complete(batch: ChunkBatch, future: Future, cached: List[Any]):
+            nonlocal last_report
+            vectors = self._finish(batch, future, cached)
+            if batch.ids:
+                upsert(batch.ids, batch.texts, batch.metadatas, vectors)
+                stats["batches"] += 1
+                stats["chunks"] += len(batch)
+                stats["cached_chunks"] += sum(vector is not None for vector in cached)
+            if batch.finished_files:
+                on_files_done(batch.finished_files)
+                stats["files"] += len(batch.finished_files)
+
+            now = time.perf_counter()
+            if now - last_report >= self.progress_interval:
+                last_report = now
+                rate = stats["chunks"] / (now - start)
+                print(f"Embedded {stats['chunks']} chunks from {stats['files']}/{len(files)} files "
+                      f"({rate:.1f} chunks/sec)")
+
+        try:
+            for batch in self.iter_batches(files):
+                in_flight.append((batch, *self._start(executor, batch)))
+                while len(in_flight) >= max_in_flight:
+                    complete(*in_flight.popleft())
+            while in_flight:
+                complete(*in_flight.popleft())
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        stats["seconds"] = time.perf_counter() - start
+        if stats["seconds"] > 0:
+            stats["chunks_per_sec"] = stats["chunks"] / stats["seconds"]
+        print(f"Embedded {stats['chunks']} chunks from {stats['files']} files in "
+              f"{stats['seconds']:.1f}s ({stats['chunks_per_sec']:.1f} chunks/sec, "
+              f"{stats['cached_chunks']} from the embedding cache)")
+        return stats
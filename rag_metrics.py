@@ -0,0 +1,149 @@
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds of the stage latency histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+LabelValues = Tuple[str, ...]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for backends that do not report one (about 4 characters per token)."""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, optionally labelled."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = self._values or ({(): 0.0} if not self.labelnames else {})
+            for key, value in sorted(values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, optionally labelled."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.labelnames = tuple(labelnames)
+        # label values -> (per-bucket counts, sum, count)
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float],
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help_text, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+QUERIES = registry.counter(
+    "rag_queries_total", "Answered queries by the path that produced the answer.", ["path"])
+QUERY_ERRORS = registry.counter(
+    "rag_query_errors_total", "Queries that raised an error.")
+STAGE_SECONDS = registry.histogram(
+    "rag_query_stage_seconds",
+    "Latency of each query stage: embed, search, rerank, prompt, generate, total, "
+    "and fast_path for cache and directory answers.",
+    LATENCY_BUCKETS, ["stage"])
+PROMPT_TOKENS = registry.histogram(
+    "rag_prompt_tokens", "Prompt tokens sent to the LLM per query.", TOKEN_BUCKETS)
+GENERATED_TOKENS = registry.histogram(
+    "rag_generated_tokens", "Tokens generated by the LLM per query.", TOKEN_BUCKETS)
+TOKENS_PER_SECOND = registry.histogram(
+    "rag_generation_tokens_per_second", "LLM generation speed per query.", RATE_BUCKETS)
+
+
+def record_stages(timings: Dict[str, float]):
+    """Observe the stage durations (in seconds) of one query."""
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def record_generation(prompt_tokens: int, generated_tokens: int, seconds: float) -> float:
+    """Observe the token counts of one generation and return its tokens/sec."""
+    PROMPT_TOKENS.observe(prompt_tokens)
+    GENERATED_TOKENS.observe(generated_tokens)
+    rate = generated_tokens / seconds if seconds > 0 else 0.0
+    TOKENS_PER_SECOND.observe(rate)
+    return rate
@@ -0,0 +1,113 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+import rag_config
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models.
+
+    Each embedding model, LLM client and cross-encoder is built once, on first use,
+    and the same instance is handed to every RAG corpus that asks for it. Loading is
+    serialized per key, so corpora initializing in parallel wait for the first load
+    instead of loading the model again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    return self._models[key]
+            model = load()
+            with self._lock:
+                self._models[key] = model
+            return model
+
+    def embeddings(self, model_name: str = rag_config.EMBEDDING_MODEL) -> Any:
+        """The sentence-transformer embeddings of a model."""
+        def load():
+            from langchain_huggingface import HuggingFaceEmbeddings
+            return HuggingFaceEmbeddings(model_name=model_name)
+        return self._get(("embeddings", model_name), load)
+
+    def query_embeddings(self, model_name: str = rag_config.EMBEDDING_MODEL) -> Any:
+        """Embeddings for questions, micro-batched across every corpus that shares the model."""
+        if rag_config.QUERY_EMBED_BATCH_WINDOW_MS <= 0:
+            return self.embeddings(model_name)
+
+        def load():
+            from rag_batching import MicroBatchingEmbeddings
+            return MicroBatchingEmbeddings(
+                self.embeddings(model_name),
+                window_ms=rag_config.QUERY_EMBED_BATCH_WINDOW_MS,
+                max_batch_size=rag_config.QUERY_EMBED_BATCH_SIZE
+            )
+        return self._get(("query_embeddings", model_name), load)
+
+    def embedding_cache(self, model_name: str = rag_config.EMBEDDING_MODEL) -> Any:
+        """The on-disk embedding cache of a model, or None if it is disabled."""
+        if not rag_config.EMBEDDING_CACHE_ENABLED:
+            return None
+
+        def load():
+            from rag_embedding_cache import EmbeddingCache
+            return EmbeddingCache(
+                rag_config.EMBEDDING_CACHE_PATH,
+                model_name,
+                max_memory_entries=rag_config.EMBEDDING_CACHE_MEMORY_ENTRIES,
+                max_entries=rag_config.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        return self._get(("embedding_cache", model_name), load)
+
+    def cached_embeddings(self, model_name: str = rag_config.EMBEDDING_MODEL) -> Any:
+        """Embeddings of a model that reuse vectors from its embedding cache."""
+        cache = self.embedding_cache(model_name)
+        if cache is None:
+            return self.embeddings(model_name)
+
+        def load():
+            from rag_embedding_cache import CachedEmbeddings
+            return CachedEmbeddings(self.embeddings(model_name), cache)
+        return self._get(("cached_embeddings", model_name), load)
+
+    def llm(self, backend: str = rag_config.LLM_BACKEND, model_name: str = rag_config.LLM_MODEL) -> Any:
+        """The LLM client of a backend ("ollama" or "fake")."""
+        def load():
+            if backend == "fake":
+                from rag_fake_llm import FakeLLM
+                return FakeLLM(
+                    latency_ms=rag_config.FAKE_LLM_LATENCY_MS,
+                    tokens_per_sec=rag_config.FAKE_LLM_TOKENS_PER_SEC,
+                    max_tokens=rag_config.FAKE_LLM_MAX_TOKENS
+                )
+            from langchain_ollama import OllamaLLM
+            return OllamaLLM(model=model_name)
+        return self._get(("llm", backend, model_name), load)
+
+    def reranker(self, model_name: str = rag_config.RERANK_MODEL) -> Any:
+        """The cross-encoder reranker of a model, with its score cache shared by every corpus."""
+        def load():
+            from rag_rerank import CrossEncoderReranker
+            return CrossEncoderReranker(
+                model_name,
+                max_cache_entries=rag_config.RERANK_CACHE_SIZE,
+                latency_budget_ms=rag_config.RERANK_LATENCY_BUDGET_MS
+            )
+        return self._get(("reranker", model_name), load)
+
+    def loaded(self) -> list:
+        """Keys of the models loaded so far."""
+        with self._lock:
+            return [":".join(key) for key in self._models]
+
+
+registry = ModelRegistry()
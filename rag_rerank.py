@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+class CrossEncoderReranker:
+    """Second-pass ranking of retrieved chunks with a CPU cross-encoder.
+
+    Every (question, chunk) pair that is not in the LRU score cache is scored in one
+    batched ``predict`` call. The per-pair cost is tracked as a moving average; when
+    scoring the uncached pairs is expected to take longer than ``latency_budget_ms``,
+    reranking is skipped and the retrieval order is kept. Every ``_PROBE_EVERY``
+    skips one call scores anyway, so the estimate recovers after a slow spell.
+    """
+
+    # Weight of the latest call in the moving average of the per-pair cost
+    _EMA_ALPHA = 0.2
+    _PROBE_EVERY = 50
+
+    def __init__(self, model_name: str, max_cache_entries: int = 4096, latency_budget_ms: float = 150.0,
+                 model: Optional[Any] = None):
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(model_name, device="cpu")
+            # Pay the first-call overhead now, not in the latency estimate
+            model.predict([("warm up", "warm up")], show_progress_bar=False)
+        self.model = model
+        self.model_name = model_name
+        self.max_cache_entries = max_cache_entries
+        self.latency_budget = latency_budget_ms / 1000.0
+
+        self._lock = threading.Lock()
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        # Seconds per scored pair, None until the first call
+        self._pair_seconds: Optional[float] = None
+        self._skips_since_call = 0
+
+        self.calls = 0
+        self.skipped = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _key(question: str, text: str) -> Tuple[str, str]:
+        return (" ".join(question.lower().split()), hashlib.sha1(text.encode("utf-8")).hexdigest())
+
+    def _score(self, question: str, texts: List[str]) -> Optional[List[float]]:
+        """Scores of every text, or None if scoring the uncached ones would blow the budget."""
+        keys = [self._key(question, text) for text in texts]
+        scores: List[Optional[float]] = []
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                scores.append(score)
+            missing = [i for i, score in enumerate(scores) if score is None]
+            self.cache_hits += len(texts) - len(missing)
+            self.cache_misses += len(missing)
+            if not missing:
+                return scores
+            over_budget = (self._pair_seconds is not None
+                           and self._pair_seconds * len(missing) > self.latency_budget)
+            if over_budget and self._skips_since_call < self._PROBE_EVERY:
+                self.skipped += 1
+                self._skips_since_call += 1
+                return None
+            self._skips_since_call = 0
+
+        start = time.perf_counter()
+        predicted = self.model.predict([(question, texts[i]) for i in missing], batch_size=len(missing),
+                                       show_progress_bar=False)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.calls += 1
+            per_pair = elapsed / len(missing)
+            self._pair_seconds = per_pair if self._pair_seconds is None else (
+                self._EMA_ALPHA * per_pair + (1 - self._EMA_ALPHA) * self._pair_seconds)
+            for i, score in zip(missing, predicted):
+                scores[i] = float(score)
+                self._scores[keys[i]] = float(score)
+            while len(self._scores) > self.max_cache_entries:
+                self._scores.popitem(last=False)
+        return scores
+
+    def rerank(self, question: str, documents: List[Document], k: int) -> List[Document]:
+        """The ``k`` best documents by cross-encoder score, or the first ``k`` if reranking was skipped."""
+        if len(documents) <= 1:
+            return documents[:k]
+        scores = self._score(question, [doc.page_content for doc in documents])
+        if scores is None:
+            return documents[:k]
+        order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+        return [documents[i] for i in order[:k]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "model": self.model_name,
+                "calls": self.calls,
+                "skipped": self.skipped,
+                "cached_pairs": len(self._scores),
+                "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+                "pair_ms": self._pair_seconds * 1000.0 if self._pair_seconds is not None else None,
+                "latency_budget_ms": self.latency_budget * 1000.0,
+            }
@@ -0,0 +1,181 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+RETRIEVAL_MODES = ("vector", "bm25", "hybrid")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens. Hyphenated and apostrophe tokens such as phone numbers
+    ("099-890-765") and "women's" are kept whole and also split into their parts."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if "-" in token or "'" in token:
+            tokens.extend(part for part in re.split(r"[-']", token) if part)
+    return tokens
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]):
+        """Add or replace documents."""
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                if doc_id in self._doc_lengths:
+                    self._remove(doc_id)
+                term_counts = Counter(tokenize(text))
+                for term, count in term_counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+                length = sum(term_counts.values())
+                self._doc_lengths[doc_id] = length
+                self._total_length += length
+                self._documents[doc_id] = (text, metadata)
+
+    def remove(self, ids: Iterable[str]):
+        """Remove documents, ignoring unknown IDs."""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self._doc_lengths:
+                    self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        text, _ = self._documents.pop(doc_id)
+        for term in set(tokenize(text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Return the top-k (id, score) pairs for a query."""
+        with self._lock:
+            return self._search(query, k)
+
+    def search_documents(self, query: str, k: int) -> List[Document]:
+        """Return the top-k chunks for a query as Documents.
+
+        Hits are resolved under the same lock as the search, so a concurrent
+        reindex cannot remove a chunk in between.
+        """
+        with self._lock:
+            return [self.document(doc_id) for doc_id, _ in self._search(query, k)]
+
+    def _search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        n = len(self._doc_lengths)
+        if not n:
+            return []
+        avg_length = self._total_length / n
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def document(self, doc_id: str) -> Document:
+        """Return a stored chunk as a Document."""
+        text, metadata = self._documents[doc_id]
+        return Document(page_content=text, metadata=metadata, id=doc_id)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60) -> List[str]:
+    """Fuse several ranked key lists, scoring each key by sum(1 / (rrf_k + rank))."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(dict.fromkeys(ranking), start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """Retriever over a vector store and a BM25 index, fused with reciprocal rank fusion."""
+
+    vectorstore: Any
+    bm25: Any
+    k: int = 3
+    mode: str = "hybrid"
+    # Candidates taken from each ranking before fusion
+    fetch_k: int = 10
+    rrf_k: int = 60
+
+    def retrieve(self, query: str, mode: Optional[str] = None, k: Optional[int] = None,
+                 timings: Optional[Dict[str, float]] = None) -> List[Document]:
+        """Retrieve the top-k chunks with the given mode (defaults to the retriever's mode).
+
+        If ``timings`` is given, the seconds spent embedding the query and searching
+        (vector search, BM25 and fusion) are stored in it under "embed" and "search".
+        """
+        mode = mode or self.mode
+        k = k or self.k
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}', expected one of {', '.join(RETRIEVAL_MODES)}")
+
+        start = time.perf_counter()
+        embed_seconds = 0.0
+        query_vector = None
+        if mode != "bm25":
+            query_vector = self.vectorstore.embeddings.embed_query(query)
+            embed_seconds = time.perf_counter() - start
+
+        if mode == "vector":
+            documents = self.vectorstore.similarity_search_by_vector(query_vector, k=k)
+        elif mode == "bm25":
+            documents = self.bm25.search_documents(query, k)
+        else:
+            documents = self._fuse(query, query_vector, k)
+
+        if timings is not None:
+            timings["embed"] = embed_seconds
+            timings["search"] = time.perf_counter() - start - embed_seconds
+        return documents
+
+    def _fuse(self, query: str, query_vector: List[float], k: int) -> List[Document]:
+        # Fuse on chunk text so both rankings agree on identity whether or not the
+        # vector store returns IDs; identical chunks collapse into one
+        by_text: Dict[str, Document] = {}
+        rankings = [
+            self.vectorstore.similarity_search_by_vector(query_vector, k=self.fetch_k),
+            self.bm25.search_documents(query, self.fetch_k),
+        ]
+        for ranking in rankings:
+            for doc in ranking:
+                by_text.setdefault(doc.page_content, doc)
+
+        fused = reciprocal_rank_fusion(
+            [[doc.page_content for doc in ranking] for ranking in rankings], self.rrf_k
+        )
+        return [by_text[text] for text in fused[:k]]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.retrieve(query)
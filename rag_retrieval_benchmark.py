@@ -0,0 +1,200 @@
+import argparse
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import rag_config
+from rag_models import registry
+from rag_retrieval import RETRIEVAL_MODES, HybridRetriever
+from rag_system import RAGSystem
+
+# Retrieval-only benchmark: builds an index per chunking configuration and reports
+# recall@k, MRR, build time, index size and search latency per retrieval mode and k,
+# without calling the LLM.
+#
+#   python rag_retrieval_benchmark.py --chunk-sizes 250,500,1000 --overlaps 0,50,100 --ks 1,3,5
+
+
+def load_labelled_questions(path: str) -> List[Dict[str, Any]]:
+    """Read JSONL items {"question", "doctors": [...], "sources": [...]}; at least one label is required."""
+    items = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not item.get("doctors") and not item.get("sources"):
+                raise ValueError(f"Question without expected doctors or sources: {item['question']}")
+            items.append(item)
+    return items
+
+
+def _expected(item: Dict[str, Any]) -> List[str]:
+    """The labels a retrieval must find: the expected doctors, or else the expected source files."""
+    return item.get("doctors") or item["sources"]
+
+
+def _hits(item: Dict[str, Any], doc: Any) -> List[str]:
+    """Expected labels a retrieved chunk covers."""
+    if item.get("doctors"):
+        text = doc.page_content.lower()
+        sources = item.get("sources")
+        if sources and os.path.basename(doc.metadata.get("source", "")) not in sources:
+            return []
+        return [name for name in item["doctors"] if name.lower() in text]
+    source = os.path.basename(doc.metadata.get("source", ""))
+    return [source] if source in item["sources"] else []
+
+
+def score_ranking(item: Dict[str, Any], documents: List[Any], ks: List[int]) -> Dict[str, Any]:
+    """Recall at each k and rank of the first relevant chunk (None if there is none) of one ranked list."""
+    expected = _expected(item)
+    found = set()
+    recall = {}
+    first_relevant = None
+    for rank, doc in enumerate(documents, start=1):
+        hits = _hits(item, doc)
+        if hits and first_relevant is None:
+            first_relevant = rank
+        found.update(hits)
+        if rank in ks:
+            recall[rank] = len(found) / len(expected)
+    for k in ks:
+        # Fewer chunks than k were returned
+        recall.setdefault(k, len(found) / len(expected))
+    return {"recall": recall, "first_relevant": first_relevant}
+
+
+def _index_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def benchmark_config(embeddings: Any, items: List[Dict[str, Any]], docs_dir: str, chunk_size: int,
+                     chunk_overlap: int, ks: List[int], modes: List[str], backend: str) -> List[Dict[str, Any]]:
+    """Build a fresh index with one chunking configuration and score every mode and k on it."""
+    db_dir = tempfile.mkdtemp(prefix="rag-bench-")
+    try:
+        # Without the embedding cache: build_seconds measures embedding, and the sweep's
+        # chunk variants are not written to the production cache file
+        rag = RAGSystem(docs_dir=docs_dir, db_dir=db_dir, chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                        vector_backend=backend, use_embedding_cache=False)
+        # Share one loaded model across every configuration
+        rag.embeddings = rag.query_embeddings = embeddings
+
+        start = time.perf_counter()
+        rag.setup_vectorstore()
+        rag.update_index()
+        build_seconds = time.perf_counter() - start
+        index_bytes = _index_size(rag.index_dir)
+        chunks = len(rag.bm25)
+
+        retriever = HybridRetriever(vectorstore=rag.vectorstore, bm25=rag.bm25, k=max(ks),
+                                    fetch_k=max(rag_config.HYBRID_FETCH_K, max(ks)))
+        rows = []
+        for mode in modes:
+            # One search at the largest k; smaller k are its prefixes
+            latencies = []
+            scores = []
+            for item in items:
+                search_start = time.perf_counter()
+                documents = retriever.retrieve(item["question"], mode=mode, k=max(ks))
+                latencies.append(time.perf_counter() - search_start)
+                scores.append(score_ranking(item, documents, ks))
+            latency_ms = np.array(latencies) * 1000.0
+            for k in ks:
+                rows.append({
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "mode": mode,
+                    "k": k,
+                    "recall_at_k": round(float(np.mean([s["recall"][k] for s in scores])), 4),
+                    "mrr": round(float(np.mean([
+                        1.0 / s["first_relevant"] if s["first_relevant"] and s["first_relevant"] <= k else 0.0
+                        for s in scores
+                    ])), 4),
+                    "chunks": chunks,
+                    "build_seconds": round(build_seconds, 2),
+                    "index_bytes": index_bytes,
+                    "search_ms_mean": round(float(latency_ms.mean()), 2),
+                    "search_ms_p95": round(float(np.percentile(latency_ms, 95)), 2),
+                })
+        return rows
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def recommend(rows: List[Dict[str, Any]], tolerance: float) -> Optional[Dict[str, Any]]:
+    """The configuration with the smallest prompt context (chunk_size * k) whose recall is
+    within ``tolerance`` of the best, ties broken by search latency."""
+    if not rows:
+        return None
+    best = max(row["recall_at_k"] for row in rows)
+    candidates = [row for row in rows if row["recall_at_k"] >= best - tolerance]
+    return min(candidates, key=lambda row: (row["chunk_size"] * row["k"], row["search_ms_mean"]))
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and cost without the LLM")
+    parser.add_argument("--questions", default="evaluation/retrieval_ground_truth.jsonl",
+                        help="JSONL questions labelled with expected doctors and/or source files")
+    parser.add_argument("--docs-dir", default="data/docs")
+    parser.add_argument("--chunk-sizes", type=_ints, default=[250, 500, 1000])
+    parser.add_argument("--overlaps", type=_ints, default=[0, 50, 100])
+    parser.add_argument("--ks", type=_ints, default=[1, 3, 5])
+    parser.add_argument("--modes", default=",".join(RETRIEVAL_MODES))
+    parser.add_argument("--backend", default=rag_config.VECTOR_BACKEND, choices=["chroma", "numpy"])
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Recall a recommended configuration may lose against the best one")
+    parser.add_argument("--output", default="evaluation/retrieval_benchmark.json")
+    args = parser.parse_args(argv)
+
+    items = load_labelled_questions(args.questions)
+    modes = [mode for mode in args.modes.split(",") if mode]
+    for mode in modes:
+        if mode not in RETRIEVAL_MODES:
+            parser.error(f"Unknown retrieval mode '{mode}'")
+    ks = sorted(set(args.ks))
+    embeddings = registry.embeddings(rag_config.EMBEDDING_MODEL)
+
+    rows = []
+    for chunk_size, chunk_overlap in itertools.product(args.chunk_sizes, args.overlaps):
+        if chunk_overlap >= chunk_size:
+            continue
+        print(f"Benchmarking chunk_size={chunk_size} chunk_overlap={chunk_overlap}")
+        rows.extend(benchmark_config(embeddings, items, args.docs_dir, chunk_size, chunk_overlap,
+                                     ks, modes, args.backend))
+
+    print(f"\n{'size':>5} {'overlap':>7} {'mode':>7} {'k':>2} {'recall':>7} {'mrr':>6} "
+          f"{'build_s':>8} {'index_kb':>9} {'search_ms':>9}")
+    for row in rows:
+        print(f"{row['chunk_size']:>5} {row['chunk_overlap']:>7} {row['mode']:>7} {row['k']:>2} "
+              f"{row['recall_at_k']:>7.3f} {row['mrr']:>6.3f} {row['build_seconds']:>8.2f} "
+              f"{row['index_bytes'] / 1024:>9.1f} {row['search_ms_mean']:>9.2f}")
+
+    best = recommend(rows, args.tolerance)
+    if best:
+        print(f"\nCheapest configuration within {args.tolerance} of the best recall: "
+              f"chunk_size={best['chunk_size']} chunk_overlap={best['chunk_overlap']} "
+              f"mode={best['mode']} k={best['k']} (recall@k {best['recall_at_k']:.3f})")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"questions": len(items), "results": rows, "recommended": best}, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
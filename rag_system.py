@@ -1,74 +1,303 @@
 import os
-from typing import List, Dict, Any
-from flask import Flask, request, jsonify
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import cross_origin
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_ollama import OllamaLLM
-from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 from datetime import datetime
 
+import rag_config
+import rag_metrics
+from rag_appointments import TIME_FORMAT, AppointmentStore
+from rag_batching import MicroBatchingEmbeddings
+from rag_cache import AnswerCache
+from rag_context import ContextAssembler
+from rag_directory import DoctorDirectory, parse_doctor_records
+from rag_ingestion import IngestionPipeline
+from rag_models import registry
+from rag_retrieval import RETRIEVAL_MODES, BM25Index, HybridRetriever
+from rag_vector_index import NumpyVectorStore
+
 app = Flask(__name__)
 
-# Simple in-memory store for appointments (replace with a database in production)
-appointments: List[Dict[str, Any]] = []
+# Initialization stages, in order, reported by /api/health
+INIT_STAGES = ("model_load", "index_open", "index_update", "chain_ready")
+
+# Bookings, shared with every other worker process serving the same file. Opened on
+# first use, so importing this module does not touch the database.
+_appointment_store: Optional[AppointmentStore] = None
+_appointment_store_lock = threading.Lock()
+
+
+def appointment_store() -> AppointmentStore:
+    global _appointment_store
+    if _appointment_store is None:
+        with _appointment_store_lock:
+            if _appointment_store is None:
+                _appointment_store = AppointmentStore(rag_config.APPOINTMENTS_DB)
+    return _appointment_store
 
 
 class RAGSystem:
-    def __init__(self, docs_dir: str = "data/docs", db_dir: str = "data/vectordb"):
-        """Initialize RAG system with directory paths."""
+    def __init__(
+        self,
+        docs_dir: str = "data/docs",
+        db_dir: str = "data/vectordb",
+        chunk_size: int = rag_config.CHUNK_SIZE,
+        chunk_overlap: int = rag_config.CHUNK_OVERLAP,
+        embed_batch_size: int = rag_config.EMBED_BATCH_SIZE,
+        embed_workers: int = rag_config.EMBED_WORKERS,
+        vector_backend: str = rag_config.VECTOR_BACKEND,
+        name: str = "default",
+        use_embedding_cache: bool = True,
+    ):
+        """Initialize RAG system with directory paths, ingestion settings, vector backend
+        and the corpus name requests use to select it. ``use_embedding_cache=False``
+        embeds every chunk, bypassing the shared embedding cache."""
+        if vector_backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown vector backend '{vector_backend}', expected 'chroma' or 'numpy'")
+        self.name = name
         self.docs_dir = docs_dir
         self.db_dir = db_dir
+        self.vector_backend = vector_backend
+        self.embed_batch_size = embed_batch_size
+        self.embed_workers = embed_workers
+        self.use_embedding_cache = use_embedding_cache
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        # Each backend (and numpy storage format) keeps its own files and manifest, so
+        # switching backends or RAG_VECTOR_QUANTIZE re-indexes
+        if vector_backend == "chroma":
+            self.index_dir = db_dir
+        else:
+            self.index_dir = os.path.join(db_dir, "numpy-int8" if rag_config.VECTOR_QUANTIZE else "numpy")
+        self.manifest_path = os.path.join(self.index_dir, "manifest.json")
+        self.embeddings = None
+        # Embeddings used for questions, micro-batched across concurrent requests
+        self.query_embeddings = None
         self.vectorstore = None
-        self.qa_chain = None
+        self.bm25 = BM25Index()
+        self.retriever = None
+        self.reranker = None
+        self.llm = None
+        self.prompt = None
+        self.context_assembler = ContextAssembler(
+            max_tokens=rag_config.CONTEXT_MAX_TOKENS,
+            duplicate_threshold=rag_config.CONTEXT_DUPLICATE_THRESHOLD
+        )
+        self.answer_cache = None
+        self.directory = DoctorDirectory([])
+        # Hash of the indexed files, changes whenever the index does
+        self.corpus_version = None
+
+        self.stages = {name: {"status": "pending", "duration_ms": None} for name in INIT_STAGES}
+        self.init_error = None
+        self._init_lock = threading.Lock()
+        self._reindex_lock = threading.Lock()
+        self._init_thread = None
 
         # Create directories if they don't exist
         os.makedirs(docs_dir, exist_ok=True)
-        os.makedirs(db_dir, exist_ok=True)
-
-    def load_documents(self) -> List[Any]:
-        """Load all text documents from the docs directory."""
-        loader = DirectoryLoader(
-            self.docs_dir,
-            glob="**/*.txt",
-            loader_cls=TextLoader
-        )
-        documents = loader.load()
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def scan_documents(self) -> Dict[str, str]:
+        """Return a mapping of every text document in the docs directory to its content hash."""
+        hashes = {}
+        for root, _, files in os.walk(self.docs_dir):
+            for name in sorted(files):
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(65536), b""):
+                        digest.update(block)
+                hashes[path] = digest.hexdigest()
+        return hashes
+
+    def load_documents(self, paths: Optional[List[str]] = None) -> List[Any]:
+        """Load text documents from the docs directory, or only the given paths."""
+        if paths is None:
+            loader = DirectoryLoader(
+                self.docs_dir,
+                glob="**/*.txt",
+                loader_cls=TextLoader
+            )
+            documents = loader.load()
+        else:
+            documents = []
+            for path in paths:
+                documents.extend(TextLoader(path).load())
         print(f"Loaded {len(documents)} documents")
         return documents
 
     def process_documents(self, documents: List[Any]) -> List[Any]:
         """Split documents into chunks."""
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
-        )
-        chunks = text_splitter.split_documents(documents)
+        chunks = self.text_splitter.split_documents(documents)
         print(f"Split into {len(chunks)} chunks")
         return chunks
 
-    def setup_vectorstore(self, chunks: List[Any]):
-        """Create and persist vector store."""
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Load the per-file hash and chunk ID manifest of the persisted index."""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]):
+        """Atomically write the index manifest next to the vector store."""
+        # The manifest must never list chunks the vector store has not persisted yet
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            self.vectorstore.save()
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def load_models(self):
+        """Get the embedding model and, if enabled, the reranking cross-encoder from the
+        process-wide model registry, loading them on first use."""
+        if self.embeddings is None:
+            self.embeddings = registry.embeddings(rag_config.EMBEDDING_MODEL)
+        if self.query_embeddings is None:
+            self.query_embeddings = registry.query_embeddings(rag_config.EMBEDDING_MODEL)
+        if rag_config.RERANK_ENABLED and self.reranker is None:
+            self.reranker = registry.reranker(rag_config.RERANK_MODEL)
+
+    def _open_vectorstore(self):
+        """Open the persisted vector store of the configured backend."""
+        if self.vector_backend == "numpy":
+            return NumpyVectorStore(
+                embedding_function=self.query_embeddings,
+                persist_directory=self.index_dir,
+                quantize=rag_config.VECTOR_QUANTIZE
+            )
+        return Chroma(
+            embedding_function=self.query_embeddings,
+            persist_directory=self.index_dir
         )
 
-        self.vectorstore = Chroma.from_documents(
-            documents=chunks,
-            embedding=embeddings,
-            persist_directory=self.db_dir
+    def setup_vectorstore(self):
+        """Open the persisted vector store."""
+        self.load_models()
+
+        self.vectorstore = self._open_vectorstore()
+
+        # A store written without a manifest may hold duplicate chunks from
+        # earlier full re-indexes; start it over so the manifest is authoritative.
+        if not os.path.exists(self.manifest_path) and self.vectorstore.get(include=[])["ids"]:
+            print("Found vector store without manifest, rebuilding it")
+            self.vectorstore.delete_collection()
+            self.vectorstore = self._open_vectorstore()
+
+        # The keyword index lives in memory, rebuild it from the persisted chunks
+        existing = self.vectorstore.get(include=["documents", "metadatas"])
+        self.bm25.add(existing["ids"], existing["documents"], existing["metadatas"])
+        print(f"Opened {self.vector_backend} vector store at {self.index_dir} ({len(self.bm25)} chunks)")
+
+    def _upsert(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]],
+                vectors: List[List[float]]):
+        """Bulk upsert pre-computed embeddings into the vector store and the keyword index."""
+        collection = self.vectorstore
+        if isinstance(self.vectorstore, Chroma):
+            collection = self.vectorstore._collection
+        collection.upsert(
+            ids=ids,
+            embeddings=vectors,
+            documents=texts,
+            metadatas=metadatas
+        )
+        self.bm25.add(ids, texts, metadatas)
+
+    def _delete(self, ids: List[str]):
+        """Remove chunks from the vector store and the keyword index."""
+        self.vectorstore.delete(ids=ids)
+        self.bm25.remove(ids)
+
+    def update_index(self):
+        """Embed added or changed documents and drop chunks of changed or deleted ones."""
+        manifest = self._load_manifest()
+        current = self.scan_documents()
+
+        stale_ids = []
+        changed = []
+        for source, file_hash in current.items():
+            entry = manifest.get(source)
+            if entry is not None and entry["hash"] == file_hash:
+                continue
+            if entry is not None:
+                stale_ids.extend(entry["chunk_ids"])
+            changed.append(source)
+
+        # Manifests written before the doctor directory existed lack its records
+        for source, entry in manifest.items():
+            if source in current and source not in changed and "doctors" not in entry:
+                with open(source, "r", encoding="utf-8") as f:
+                    entry["doctors"] = parse_doctor_records(f.read(), source)
+
+        removed = [source for source in manifest if source not in current]
+        for source in removed:
+            stale_ids.extend(manifest.pop(source)["chunk_ids"])
+
+        if stale_ids:
+            self._delete(stale_ids)
+            print(f"Removed {len(stale_ids)} stale chunks")
+
+        if changed:
+            pipeline = IngestionPipeline(
+                text_splitter=self.text_splitter,
+                embeddings=self.embeddings,
+                model_name=rag_config.EMBEDDING_MODEL,
+                batch_size=self.embed_batch_size,
+                workers=self.embed_workers,
+                extract=parse_doctor_records,
+                cache=registry.embedding_cache(rag_config.EMBEDDING_MODEL) if self.use_embedding_cache else None,
+            )
+            last_save = time.monotonic()
+
+            def on_files_done(finished):
+                nonlocal last_save
+                for source, ids, doctors in finished:
+                    manifest[source] = {"hash": current[source], "chunk_ids": ids, "doctors": doctors}
+                # Persist progress periodically so an interrupted run resumes where it stopped
+                if time.monotonic() - last_save >= 5.0:
+                    self._save_manifest(manifest)
+                    last_save = time.monotonic()
+
+            pipeline.run(
+                {source: current[source] for source in changed},
+                upsert=self._upsert,
+                on_files_done=on_files_done,
+            )
+
+        self._save_manifest(manifest)
+        self.directory = DoctorDirectory(
+            [record for entry in manifest.values() for record in entry.get("doctors", [])]
         )
-        print(f"Created vector store at {self.db_dir}")
+        self.corpus_version = hashlib.sha256(
+            json.dumps({source: entry["hash"] for source, entry in manifest.items()},
+                       sort_keys=True).encode()
+        ).hexdigest()
+        print(f"Index up to date: {len(changed)} files embedded, "
+              f"{len(removed)} removed, {len(current) - len(changed)} unchanged, "
+              f"{len(self.directory)} doctors in directory")
 
     def setup_qa_chain(self):
-        """Set up the QA chain with Ollama."""
-        # Initialize Ollama with the specified model
-        llm = OllamaLLM(model="llama3.2:1b")
+        """Set up the LLM (Ollama, or the fake LLM for benchmarks), prompt and retriever queries run through."""
+        # The LLM client is shared by every corpus
+        llm = registry.llm(rag_config.LLM_BACKEND, rag_config.LLM_MODEL)
         
-        # Create prompt template
+        # Everything before {context} is static, so the prompt prefix stays byte-identical
+        # across requests and Ollama can reuse its KV cache for it
         prompt_template = """You are a helpful hospital assistant that helps patients find the right specialist and schedule appointments. Use the provided hospital information to assist patients.
 
         If you cannot find specific information in the context, say "I apologize, but I don't have enough information about that. Please contact our hospital directly at [contact number] for more details."
@@ -95,87 +324,546 @@ class RAGSystem:
             template=prompt_template,
             input_variables=["context", "question"]
         )
-        
-        # Create the chain
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=llm,
-            chain_type="stuff",
-            retriever=self.vectorstore.as_retriever(search_kwargs={"k": 3}),
-            chain_type_kwargs={"prompt": PROMPT},
-            return_source_documents=True
+        self.llm = llm
+        self.prompt = PROMPT
+
+        self.retriever = HybridRetriever(
+            vectorstore=self.vectorstore,
+            bm25=self.bm25,
+            k=rag_config.RETRIEVAL_K,
+            mode=rag_config.RETRIEVAL_MODE,
+            fetch_k=rag_config.HYBRID_FETCH_K
         )
 
+    @contextmanager
+    def _stage(self, name: str):
+        """Time one initialization stage and record its status."""
+        stage = self.stages[name]
+        stage["status"] = "running"
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            stage["status"] = "failed"
+            raise
+        else:
+            stage["status"] = "ready"
+        finally:
+            stage["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
     def initialize(self):
         """Initialize the complete RAG system."""
-        documents = self.load_documents()
-        chunks = self.process_documents(documents)
-        self.setup_vectorstore(chunks)
-        self.setup_qa_chain()
-        print("RAG system initialized and ready!")
-
-    def query(self, question: str) -> Dict[str, Any]:
-        """Query the RAG system."""
-        if not self.qa_chain:
+        with self._stage("model_load"):
+            self.load_models()
+        with self._stage("index_open"):
+            self.setup_vectorstore()
+        with self._stage("index_update"):
+            self.update_index()
+        with self._stage("chain_ready"):
+            self.setup_qa_chain()
+            if rag_config.ANSWER_CACHE_ENABLED:
+                self.answer_cache = AnswerCache(
+                    self.query_embeddings,
+                    max_entries=rag_config.ANSWER_CACHE_SIZE,
+                    ttl_seconds=rag_config.ANSWER_CACHE_TTL,
+                    similarity_threshold=rag_config.ANSWER_CACHE_SIMILARITY
+                )
+        timings = ", ".join(f"{name} {stage['duration_ms']} ms" for name, stage in self.stages.items())
+        print(f"RAG system '{self.name}' initialized and ready! ({timings})")
+
+    def start_background_init(self) -> Optional[threading.Thread]:
+        """Run initialize() on a background thread, once; later calls return the same thread.
+        Does nothing if initialize() already ran in the foreground."""
+        with self._init_lock:
+            if self._init_thread is None and not self.ready:
+                def run():
+                    try:
+                        self.initialize()
+                    except Exception as e:
+                        self.init_error = str(e)
+                        print(f"RAG system '{self.name}' failed to initialize: {e}")
+
+                self._init_thread = threading.Thread(target=run, name=f"rag-init-{self.name}", daemon=True)
+                self._init_thread.start()
+            return self._init_thread
+
+    def reindex(self) -> Optional[Dict[str, Any]]:
+        """Pick up added, changed and deleted documents while serving.
+
+        Queries keep running against the index as it is updated. The new corpus
+        version drops the answer cache. Returns None if a reindex is already running.
+        """
+        if not self.ready:
             raise ValueError("RAG system not initialized. Call initialize() first.")
-        
-        result = self.qa_chain.invoke({"query": question})
-        return {
-            "answer": result["result"],
-            "sources": [doc.metadata for doc in result["source_documents"]]
+        if not self._reindex_lock.acquire(blocking=False):
+            return None
+        try:
+            previous = self.corpus_version
+            self.update_index()
+            return {"corpus": self.name, "corpus_version": self.corpus_version,
+                    "changed": self.corpus_version != previous}
+        finally:
+            self._reindex_lock.release()
+
+    @property
+    def ready(self) -> bool:
+        # The retriever is set last by setup_qa_chain
+        return self.retriever is not None and self.prompt is not None
+
+    def status(self) -> Dict[str, Any]:
+        """Overall initialization status and per-stage readiness and durations."""
+        if self.ready:
+            status = "ready"
+        elif self.init_error:
+            status = "failed"
+        else:
+            status = "starting"
+        return {"status": status, "error": self.init_error, "stages": self.stages}
+
+    def _cache_for(self, mode: Optional[str], use_cache: bool) -> Optional[AnswerCache]:
+        """The answer cache, if it applies to a query in the given retrieval mode."""
+        # Cached answers were produced with the default retrieval mode
+        if use_cache and mode in (None, self.retriever.mode):
+            return self.answer_cache
+        return None
+
+    def _fast_answer(self, question: str, cache: Optional[AnswerCache]) -> Optional[Dict[str, Any]]:
+        """Answer from the answer cache or the doctor directory, without the LLM."""
+        start = time.perf_counter()
+        if cache is not None:
+            cached = cache.get(question, self.corpus_version)
+            if cached is not None:
+                rag_metrics.QUERIES.inc(path="cache")
+                rag_metrics.record_stages({"fast_path": time.perf_counter() - start})
+                return cached
+        # Simple factual lookups (hours, languages, phone, specialty) skip the LLM
+        response = self.directory.answer(question)
+        if response is not None:
+            rag_metrics.QUERIES.inc(path="directory")
+            rag_metrics.record_stages({"fast_path": time.perf_counter() - start})
+        return response
+
+    def fast_answer(self, question: str, mode: Optional[str] = None,
+                    use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Answer from the answer cache or the doctor directory, or None if the LLM is needed."""
+        if not self.ready:
+            raise ValueError("RAG system not initialized. Call initialize() first.")
+        return self._fast_answer(question, self._cache_for(mode, use_cache))
+
+    def _retrieve(self, question: str, mode: Optional[str], timings: Dict[str, float]) -> List[Any]:
+        """Retrieve the top-k chunks, over-fetching and reranking them when a reranker is loaded."""
+        if self.reranker is None:
+            return self.retriever.retrieve(question, mode=mode, timings=timings)
+        candidates = self.retriever.retrieve(question, mode=mode, k=rag_config.RERANK_FETCH_K, timings=timings)
+        start = time.perf_counter()
+        documents = self.reranker.rerank(question, candidates, self.retriever.k)
+        timings["rerank"] = time.perf_counter() - start
+        return documents
+
+    def _build_prompt(self, question: str, documents: List[Any]) -> Tuple[str, List[Any]]:
+        """Deduplicate and pack the retrieved chunks under the context budget and fill
+        the prompt with them. Returns the prompt and the chunks it contains."""
+        documents = self.context_assembler.assemble(documents)
+        prompt = self.prompt.format(
+            context=ContextAssembler.join(documents),
+            question=question
+        )
+        return prompt, documents
+
+    @staticmethod
+    def _timings_block(timings: Dict[str, float], usage: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage durations in milliseconds plus token usage, for the optional response block."""
+        block: Dict[str, Any] = {f"{stage}_ms": round(seconds * 1000, 1) for stage, seconds in timings.items()}
+        block.update(usage)
+        return block
+
+    def query(self, question: str, mode: Optional[str] = None, use_cache: bool = True,
+              fast_path: bool = True, include_timings: bool = False) -> Dict[str, Any]:
+        """Query the RAG system, answering from the answer cache when possible.
+
+        ``mode`` selects the retrieval mode ("vector", "bm25" or "hybrid") for this query.
+        Pass ``fast_path=False`` when ``fast_answer`` was already tried for this question.
+        With ``include_timings`` the response gets a ``timings`` block with the duration
+        of each stage (embed, search, prompt, generate) and the token counts.
+        """
+        if not self.ready:
+            raise ValueError("RAG system not initialized. Call initialize() first.")
+
+        start = time.perf_counter()
+        cache = self._cache_for(mode, use_cache)
+        if fast_path:
+            response = self._fast_answer(question, cache)
+            if response is not None:
+                if include_timings:
+                    response = dict(response, timings=self._timings_block(
+                        {"total": time.perf_counter() - start}, {"llm": False}))
+                return response
+
+        prepared = self.prepare_query(question, mode, start=start)
+        generation = self.generate(prepared)
+        return self.finish_query(prepared, generation, use_cache=use_cache, include_timings=include_timings)
+
+    def prepare_query(self, question: str, mode: Optional[str] = None,
+                      start: Optional[float] = None) -> Dict[str, Any]:
+        """Retrieve, rerank and build the prompt of an LLM query: everything before generation.
+
+        Returns the state ``generate`` and ``finish_query`` continue from, so servers can
+        run only the generation in a limited LLM slot. ``start`` is the
+        ``time.perf_counter()`` the query's total time is measured from.
+        """
+        if not self.ready:
+            raise ValueError("RAG system not initialized. Call initialize() first.")
+        if start is None:
+            start = time.perf_counter()
+        try:
+            timings: Dict[str, float] = {}
+            documents = self._retrieve(question, mode, timings)
+
+            stage_start = time.perf_counter()
+            prompt, documents = self._build_prompt(question, documents)
+            timings["prompt"] = time.perf_counter() - stage_start
+        except Exception:
+            rag_metrics.QUERY_ERRORS.inc()
+            raise
+        return {"question": question, "mode": mode, "start": start, "timings": timings,
+                "prompt": prompt, "documents": documents, "corpus_version": self.corpus_version}
+
+    def generate(self, prepared: Dict[str, Any]) -> Any:
+        """Run the LLM on the prompt of a prepared query and return its generation."""
+        stage_start = time.perf_counter()
+        try:
+            generation = self.llm.generate([prepared["prompt"]]).generations[0][0]
+        except Exception:
+            rag_metrics.QUERY_ERRORS.inc()
+            raise
+        prepared["timings"]["generate"] = time.perf_counter() - stage_start
+        return generation
+
+    def finish_query(self, prepared: Dict[str, Any], generation: Any, use_cache: bool = True,
+                     include_timings: bool = False) -> Dict[str, Any]:
+        """Record the metrics of a generated answer, cache it and build the response."""
+        timings = prepared["timings"]
+        timings["total"] = time.perf_counter() - prepared["start"]
+
+        # Ollama reports exact counts, other backends get an estimate
+        info = generation.generation_info or {}
+        prompt_tokens = info.get("prompt_eval_count") or rag_metrics.estimate_tokens(prepared["prompt"])
+        generated_tokens = info.get("eval_count") or rag_metrics.estimate_tokens(generation.text)
+        # Decode speed: Ollama's eval_duration (nanoseconds) excludes prompt evaluation,
+        # the wall-clock generate time includes it
+        if info.get("eval_count") and info.get("eval_duration"):
+            decode_seconds = info["eval_duration"] / 1e9
+        else:
+            decode_seconds = timings["generate"]
+        rag_metrics.QUERIES.inc(path="llm")
+        rag_metrics.record_stages(timings)
+        tokens_per_sec = rag_metrics.record_generation(prompt_tokens, generated_tokens, decode_seconds)
+
+        response = {
+            "answer": generation.text,
+            "sources": [doc.metadata for doc in prepared["documents"]]
         }
+        cache = self._cache_for(prepared["mode"], use_cache)
+        # An answer retrieved before a reindex finished must not be cached under the new version
+        if cache is not None and prepared["corpus_version"] == self.corpus_version:
+            cache.put(prepared["question"], response, self.corpus_version)
+        if include_timings:
+            response = dict(response, timings=self._timings_block(timings, {
+                "llm": True,
+                "prompt_tokens": prompt_tokens,
+                "generated_tokens": generated_tokens,
+                "tokens_per_sec": round(tokens_per_sec, 1)
+            }))
+        return response
+
+    def stream_query(self, question: str, mode: Optional[str] = None,
+                     use_cache: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Query the RAG system, yielding (event, data) pairs as the answer is produced.
+
+        Yields one "sources" event as soon as retrieval is done, a "token" event per
+        generated token and a final "done" event with timing stats in milliseconds.
+        """
+        if not self.ready:
+            raise ValueError("RAG system not initialized. Call initialize() first.")
+
+        start = time.perf_counter()
+        cache = self._cache_for(mode, use_cache)
+        response = self._fast_answer(question, cache)
+        if response is not None:
+            yield "sources", {"sources": response["sources"]}
+            yield "token", {"token": response["answer"]}
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            yield "done", {"llm": False, "tokens": 1, "timings": {
+                "retrieval_ms": elapsed, "time_to_first_token_ms": elapsed, "total_ms": elapsed
+            }}
+            return
+
+        stages: Dict[str, float] = {}
+        corpus_version = self.corpus_version
+        try:
+            documents = self._retrieve(question, mode, stages)
+        except Exception:
+            rag_metrics.QUERY_ERRORS.inc()
+            raise
+        retrieved = time.perf_counter()
+        prompt, documents = self._build_prompt(question, documents)
+        stages["prompt"] = time.perf_counter() - retrieved
+        sources = [doc.metadata for doc in documents]
+        yield "sources", {"sources": sources}
+
+        tokens = []
+        first_token = None
+        generation_start = time.perf_counter()
+        try:
+            for token in self.llm.stream(prompt):
+                if first_token is None:
+                    first_token = time.perf_counter()
+                tokens.append(token)
+                yield "token", {"token": token}
+        except Exception:
+            rag_metrics.QUERY_ERRORS.inc()
+            raise
+        end = time.perf_counter()
+
+        # Each streamed chunk is one token for Ollama
+        stages["generate"] = end - generation_start
+        stages["total"] = end - start
+        rag_metrics.QUERIES.inc(path="llm")
+        rag_metrics.record_stages(stages)
+        # Decode speed, after the prompt was evaluated and the first token came out
+        rag_metrics.record_generation(rag_metrics.estimate_tokens(prompt), len(tokens), end - (first_token or end))
+
+        if cache is not None and corpus_version == self.corpus_version:
+            cache.put(question, {"answer": "".join(tokens), "sources": sources}, self.corpus_version)
+        yield "done", {"llm": True, "tokens": len(tokens), "timings": {
+            "retrieval_ms": round((retrieved - start) * 1000, 1),
+            "time_to_first_token_ms": round(((first_token or end) - start) * 1000, 1),
+            "generation_ms": round((end - retrieved) * 1000, 1),
+            "total_ms": round((end - start) * 1000, 1)
+        }}
+
+
+def corpus_dirs(name: str) -> Tuple[str, str]:
+    """Documents and index directory of a named corpus; "default" keeps the original paths."""
+    if name == "default":
+        return "data/docs", "data/vectordb"
+    return os.path.join("data", "corpora", name, "docs"), os.path.join("data", "corpora", name, "vectordb")
+
 
 # app = Flask(__name__)
-rag_system = RAGSystem()
-rag_system.initialize()
+# One RAG system per corpus (e.g. hospital branch), all sharing the models of rag_models.registry.
+# Initialized lazily in the background, so importing this module stays cheap and
+# the server answers health checks while models and the index load
+rag_systems: Dict[str, RAGSystem] = {}
+for corpus_name in rag_config.CORPORA:
+    docs_path, db_path = corpus_dirs(corpus_name)
+    rag_systems[corpus_name] = RAGSystem(docs_dir=docs_path, db_dir=db_path, name=corpus_name)
+rag_system = rag_systems[rag_config.DEFAULT_CORPUS]
+
+
+def start_background_init():
+    """Start initializing every corpus in the background."""
+    for system in rag_systems.values():
+        system.start_background_init()
+
+
+@app.before_request
+def ensure_initializing():
+    start_background_init()
+
+
+def get_rag_system(corpus: Optional[str]) -> Optional[RAGSystem]:
+    """The RAG system of a corpus (the default one if not given), or None if it does not exist."""
+    return rag_systems.get(corpus or rag_config.DEFAULT_CORPUS)
+
+
+def _not_ready(system: RAGSystem):
+    """503 response while the RAG system is still starting."""
+    return jsonify({"error": "RAG system is starting, please retry shortly",
+                    "initialization": system.status()}), 503
+
+
+def _query_params():
+    """Validate a query request body, returning (question, mode, RAG system, error response)."""
+    data = request.json
+    if not data or 'question' not in data:
+        return None, None, None, (jsonify({"error": "Missing 'question' in request"}), 400)
+    mode = data.get('mode')
+    if mode is not None and mode not in RETRIEVAL_MODES:
+        return None, None, None, (
+            jsonify({"error": f"Invalid 'mode', use one of: {', '.join(RETRIEVAL_MODES)}"}), 400)
+    system = get_rag_system(data.get('corpus'))
+    if system is None:
+        return None, None, None, (
+            jsonify({"error": f"Unknown 'corpus', use one of: {', '.join(rag_systems)}"}), 404)
+    return data['question'], mode, system, None
+
 
 @app.route('/api/query', methods=['POST'])
 @cross_origin()
 def api_query():
     """API endpoint for querying the RAG system."""
-    data = request.json
-    if not data or 'question' not in data:
-        return jsonify({"error": "Missing 'question' in request"}), 400
+    question, mode, system, error = _query_params()
+    if error:
+        return error
+    if not system.ready:
+        return _not_ready(system)
 
+    include_timings = bool(request.json.get('timings', rag_config.RESPONSE_TIMINGS))
     try:
-        result = rag_system.query(data['question'])
+        result = system.query(question, mode=mode, include_timings=include_timings)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-# Booking Appointment Endpoint
-@app.route('/api/book-appointment', methods=['POST'])
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/query/stream', methods=['POST'])
 @cross_origin()
-def api_book_appointment():
-    """API endpoint for booking an appointment."""
-    data = request.json
+def api_query_stream():
+    """API endpoint streaming sources, answer tokens and timing stats as server-sent events."""
+    question, mode, system, error = _query_params()
+    if error:
+        return error
+    if not system.ready:
+        return _not_ready(system)
+
+    def generate():
+        try:
+            for event, data in system.stream_query(question, mode=mode):
+                yield _sse(event, data)
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def book_appointment(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Validate and record a booking, returning (response body, HTTP status)."""
     if not data or 'doctor' not in data or 'patient_name' not in data or 'appointment_time' not in data:
-        return jsonify({"error": "Missing required fields: 'doctor', 'patient_name', 'appointment_time'"}), 400
+        return {"error": "Missing required fields: 'doctor', 'patient_name', 'appointment_time'"}, 400
 
     doctor = data['doctor']
     patient_name = data['patient_name']
+    if not isinstance(doctor, str) or not doctor.strip() or not isinstance(patient_name, str) or not patient_name.strip():
+        return {"error": "'doctor' and 'patient_name' must be non-empty strings"}, 400
     try:
-        appointment_time = datetime.strptime(data['appointment_time'], '%Y-%m-%d %H:%M')
-    except ValueError:
-        return jsonify({"error": "Invalid 'appointment_time' format. Use 'YYYY-MM-DD HH:MM'"}), 400
+        appointment_time = datetime.strptime(data['appointment_time'], TIME_FORMAT)
+    except (TypeError, ValueError):
+        return {"error": "Invalid 'appointment_time' format. Use 'YYYY-MM-DD HH:MM'"}, 400
 
     # Basic validation (expand as needed based on doctor availability from RAG data)
     if appointment_time < datetime.now():
-        return jsonify({"error": "Cannot book appointments in the past"}), 400
-
-    # Simulate booking (replace with actual logic if integrated with a database)
-    appointment = {
-        "doctor": doctor,
-        "patient_name": patient_name,
-        "appointment_time": appointment_time.strftime('%Y-%m-%d %H:%M'),
-        "status": "confirmed"
-    }
-    appointments.append(appointment)
+        return {"error": "Cannot book appointments in the past"}, 400
+
+    appointment = appointment_store().book(doctor, patient_name, appointment_time)
+    if appointment is None:
+        return {"error": f"{doctor} already has an appointment on {appointment_time.strftime(TIME_FORMAT)}"}, 409
 
-    return jsonify({
-        "message": f"Appointment booked with {doctor} for {patient_name} on {appointment_time.strftime('%Y-%m-%d %H:%M')}",
+    return {
+        "message": f"Appointment booked with {doctor} for {patient_name} on {appointment['appointment_time']}",
         "appointment": appointment
-    }), 201
+    }, 201
+
+
+def list_appointments(args: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Appointments filtered by the optional 'doctor', 'from' and 'to' ('YYYY-MM-DD HH:MM',
+    'to' exclusive), 'limit' and 'offset' query parameters, returning (response body, HTTP status)."""
+    try:
+        start = datetime.strptime(args['from'], TIME_FORMAT) if args.get('from') else None
+        end = datetime.strptime(args['to'], TIME_FORMAT) if args.get('to') else None
+    except ValueError:
+        return {"error": "Invalid 'from' or 'to' format. Use 'YYYY-MM-DD HH:MM'"}, 400
+    try:
+        limit = int(args.get('limit', 100))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        return {"error": "'limit' and 'offset' must be integers"}, 400
+    if not 1 <= limit <= 1000 or offset < 0:
+        return {"error": "'limit' must be between 1 and 1000 and 'offset' not negative"}, 400
+
+    appointments = appointment_store().list(doctor=args.get('doctor') or None, start=start, end=end,
+                                            limit=limit, offset=offset)
+    return {"appointments": appointments, "count": len(appointments)}, 200
+
+
+# Booking Appointment Endpoint
+@app.route('/api/book-appointment', methods=['POST'])
+@cross_origin()
+def api_book_appointment():
+    """API endpoint for booking an appointment."""
+    body, status = book_appointment(request.json)
+    return jsonify(body), status
+
+
+# Appointment Listing Endpoint
+@app.route('/api/appointments', methods=['GET'])
+@cross_origin()
+def api_list_appointments():
+    """API endpoint for listing booked appointments."""
+    body, status = list_appointments(request.args)
+    return jsonify(body), status
+
+
+def reindex(data: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    """Re-scan the documents of one corpus ('corpus', default: the default corpus),
+    returning (response body, HTTP status)."""
+    system = get_rag_system((data or {}).get('corpus'))
+    if system is None:
+        return {"error": f"Unknown 'corpus', use one of: {', '.join(rag_systems)}"}, 404
+    if not system.ready:
+        return {"error": "RAG system is starting, please retry shortly"}, 503
+    result = system.reindex()
+    if result is None:
+        return {"error": f"Corpus '{system.name}' is already being reindexed"}, 409
+    return result, 200
+
+
+# Reindex Endpoint
+@app.route('/api/reindex', methods=['POST'])
+@cross_origin()
+def api_reindex():
+    """API endpoint for picking up changed documents without a restart."""
+    body, status = reindex(request.get_json(silent=True))
+    return jsonify(body), status
+
+
+def health_status() -> Dict[str, Any]:
+    """System readiness, per-stage initialization timings, appointment count and cache stats.
+
+    The top-level fields describe the default corpus, ``corpora`` has the readiness
+    and answer cache of every corpus.
+    """
+    embedding_cache = registry.embedding_cache(rag_config.EMBEDDING_MODEL)
+    return {
+        "status": "healthy",
+        "system_ready": rag_system.ready,
+        "initialization": rag_system.status(),
+        "appointments_count": appointment_store().count(),
+        "answer_cache": rag_system.answer_cache.stats() if rag_system.answer_cache else None,
+        "reranker": rag_system.reranker.stats() if rag_system.reranker else None,
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "query_embedding_batcher": (rag_system.query_embeddings.stats()
+                                    if isinstance(rag_system.query_embeddings, MicroBatchingEmbeddings) else None),
+        "corpora": {
+            name: {
+                "ready": system.ready,
+                "initialization": system.status(),
+                "answer_cache": system.answer_cache.stats() if system.answer_cache else None
+            }
+            for name, system in rag_systems.items()
+        },
+        "models": registry.loaded()
+    }
 
 
 # Health Check Endpoint
@@ -183,20 +871,29 @@ def api_book_appointment():
 @cross_origin()
 def api_health():
     """API endpoint for checking system health."""
-    return jsonify({
-        "status": "healthy",
-        "system_ready": rag_system.qa_chain is not None,
-        "appointments_count": len(appointments)
-    })
+    return jsonify(health_status())
+
+
+# Metrics Endpoint
+@app.route('/api/metrics', methods=['GET'])
+def api_metrics():
+    """Query counters and per-stage latency histograms in the Prometheus text format."""
+    return Response(rag_metrics.registry.render(), mimetype="text/plain; version=0.0.4")
 
 
 def main():
+    # Load models and the indexes in the background while the server starts
+    start_background_init()
+
     # Run the Flask app
     print("\nStarting RAG API server on http://localhost:5000")
     print("Available endpoints:")
     print("  - POST /api/query")
+    print("  - POST /api/query/stream")
     print("  - POST /api/book-appointment")
+    print("  - POST /api/reindex")
     print("  - GET /api/health")
+    print("  - GET /api/metrics")
     print("\nExample usage:")
     print('  curl -X POST http://localhost:5000/api/query -H "Content-Type: application/json" -d \'{"question": "When does Dr. Sopheak work?"}\'')
     print(
@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class NumpyVectorStore(VectorStore):
+    """Compact vector store for small corpora: normalized embeddings in one contiguous
+    float32 (or int8-quantized) matrix on disk, memory-mapped at load, searched exactly
+    with a single matrix-vector product. Chunk IDs, texts and metadata live in a side
+    array next to the matrix.
+
+    Files in ``persist_directory``:
+      vectors.npy            float32 matrix (N x dim), or
+      vectors.int8.npy       int8 matrix and
+      scales.npy             per-row float32 dequantization scales
+      chunks.json            {"ids": [...], "documents": [...], "metadatas": [...]}
+    """
+
+    # Rows dequantized at a time when searching an int8 matrix
+    _SEARCH_BLOCK = 65536
+
+    def __init__(self, embedding_function: Embeddings, persist_directory: str, quantize: bool = False):
+        self.embedding_function = embedding_function
+        self.persist_directory = persist_directory
+        self.quantize = quantize
+        os.makedirs(persist_directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        # Rows deleted since the last compaction
+        self._deleted = np.zeros(0, dtype=bool)
+        # Upserted rows not yet appended to the matrix
+        self._pending: List[np.ndarray] = []
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, name)
+
+    def _load(self):
+        chunks_path = self._path("chunks.json")
+        if not os.path.exists(chunks_path):
+            return
+        with open(chunks_path, "r") as f:
+            chunks = json.load(f)
+        self._ids = chunks["ids"]
+        self._documents = chunks["documents"]
+        self._metadatas = chunks["metadatas"]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        if self.quantize:
+            self._matrix = np.load(self._path("vectors.int8.npy"), mmap_mode="r")
+            self._scales = np.load(self._path("scales.npy"), mmap_mode="r")
+        else:
+            self._matrix = np.load(self._path("vectors.npy"), mmap_mode="r")
+        self._deleted = np.zeros(len(self._ids), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _materialize(self):
+        """Append pending rows and drop deleted ones. Caller holds the lock."""
+        if not self._pending and not self._deleted.any():
+            return
+        parts = []
+        scale_parts = []
+        if self._matrix is not None and len(self._matrix):
+            parts.append(np.asarray(self._matrix))
+            if self.quantize:
+                scale_parts.append(np.asarray(self._scales))
+        for vectors in self._pending:
+            if self.quantize:
+                quantized, scales = self._quantize(vectors)
+                parts.append(quantized)
+                scale_parts.append(scales)
+            else:
+                parts.append(vectors)
+
+        keep = ~self._deleted
+        self._matrix = np.ascontiguousarray(np.concatenate(parts)[keep]) if parts else None
+        if self.quantize:
+            self._scales = np.concatenate(scale_parts)[keep] if scale_parts else None
+
+        rows = np.flatnonzero(keep)
+        self._ids = [self._ids[row] for row in rows]
+        self._documents = [self._documents[row] for row in rows]
+        self._metadatas = [self._metadatas[row] for row in rows]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._deleted = np.zeros(len(self._ids), dtype=bool)
+        self._pending = []
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[str],
+               metadatas: List[Dict[str, Any]]):
+        """Insert or replace chunks with pre-computed embeddings (same signature as a Chroma collection)."""
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._delete_rows(ids)
+            self._pending.append(vectors)
+            self._ids.extend(ids)
+            self._documents.extend(documents)
+            self._metadatas.extend(metadata or {} for metadata in metadatas)
+            start = len(self._deleted)
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(ids), dtype=bool)])
+            for offset, chunk_id in enumerate(ids):
+                self._rows[chunk_id] = start + offset
+
+    def _delete_rows(self, ids: Iterable[str]):
+        for chunk_id in ids:
+            row = self._rows.pop(chunk_id, None)
+            if row is not None:
+                self._deleted[row] = True
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if ids is None:
+            ids = [str(len(self._ids) + i) for i in range(len(texts))]
+        metadatas = metadatas or [{} for _ in texts]
+        self.upsert(ids, self.embedding_function.embed_documents(texts), texts, metadatas)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        with self._lock:
+            self._delete_rows(ids or [])
+        return True
+
+    def delete_collection(self):
+        """Remove every chunk and the files on disk."""
+        with self._lock:
+            for name in ("vectors.npy", "vectors.int8.npy", "scales.npy", "chunks.json"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._ids, self._documents, self._metadatas, self._rows = [], [], [], {}
+            self._matrix = self._scales = None
+            self._deleted = np.zeros(0, dtype=bool)
+            self._pending = []
+
+    def get(self, include: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Return every chunk, in the shape of Chroma's ``get``."""
+        with self._lock:
+            self._materialize()
+            result: Dict[str, Any] = {"ids": list(self._ids)}
+            include = ["documents", "metadatas"] if include is None else include
+            if "documents" in include:
+                result["documents"] = list(self._documents)
+            if "metadatas" in include:
+                result["metadatas"] = list(self._metadatas)
+            return result
+
+    def save(self):
+        """Write the matrix and side array atomically and reopen the matrix memory-mapped."""
+        with self._lock:
+            self._materialize()
+            arrays = {"vectors.int8.npy" if self.quantize else "vectors.npy": self._matrix}
+            if self.quantize:
+                arrays["scales.npy"] = self._scales
+            for name, array in arrays.items():
+                if array is None:
+                    array = np.zeros((0, 0), dtype=np.int8 if name == "vectors.int8.npy" else np.float32)
+                tmp_path = self._path(name + ".tmp")
+                with open(tmp_path, "wb") as f:
+                    np.save(f, np.asarray(array))
+                os.replace(tmp_path, self._path(name))
+
+            tmp_path = self._path("chunks.json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"ids": self._ids, "documents": self._documents, "metadatas": self._metadatas}, f)
+            os.replace(tmp_path, self._path("chunks.json"))
+            self._load()
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query with every row. Caller holds the lock."""
+        if not self.quantize:
+            return self._matrix @ query
+        scores = np.empty(len(self._matrix), dtype=np.float32)
+        for start in range(0, len(self._matrix), self._SEARCH_BLOCK):
+            block = np.asarray(self._matrix[start:start + self._SEARCH_BLOCK], dtype=np.float32)
+            scores[start:start + len(block)] = (block @ query) * self._scales[start:start + len(block)]
+        return scores
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """Exact top-k by cosine similarity (higher is closer)."""
+        query = self._normalize(np.asarray([embedding], dtype=np.float32))[0]
+        with self._lock:
+            self._materialize()
+            if self._matrix is None or not len(self._matrix):
+                return []
+            scores = self._scores(query)
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (Document(page_content=self._documents[row], metadata=self._metadatas[row], id=self._ids[row]),
+                 float(scores[row]))
+                for row in top
+            ]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding_function.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k)
+
+    def _select_relevance_score_fn(self):
+        # Scores are cosine similarities in [-1, 1]
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, persist_directory: str = "data/vectordb/numpy",
+                   quantize: bool = False, **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(embedding, persist_directory, quantize=quantize)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        store.save()
+        return store
@@ -0,0 +1,66 @@
+import pytest
+
+from rag_directory import DoctorDirectory, parse_doctor_records
+
+SPECIALISTS = """
+1. Dr. Sopheak Rith - Chief Cardiologist
+   Specialization: Interventional Cardiology
+   Contact Number: 099-890-765
+   Working Hours: Monday-Friday, 8:00 AM - 4:00 PM
+   Emergency Consultations: Available on-call 24/7
+   Languages: Khmer, English
+
+2. Dr. Maria Santos - Senior Neurologist
+   Specialization: Neurology
+   Working Hours: Tuesday-Saturday, 9:00 AM - 5:00 PM
+   Languages: English, Spanish
+"""
+
+LEADERSHIP = """
+### Dr. Robert Williams - Chief Medical Officer
+**Clinic Hours:** Tuesday and Thursday, 1:00 PM - 4:00 PM
+**Languages:** English, German
+"""
+
+
+@pytest.fixture(scope="module")
+def directory():
+    return DoctorDirectory(parse_doctor_records(SPECIALISTS, "specialists.txt")
+                           + parse_doctor_records(LEADERSHIP, "leadership.txt"))
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What are Dr. Sopheak's working hours?", "Dr. Sopheak Rith's working hours: Monday-Friday, 8:00 AM - 4:00 PM."),
+    ("When is Dr. Sopheak available?", "Dr. Sopheak Rith's working hours: Monday-Friday, 8:00 AM - 4:00 PM."),
+    ("Is Dr. Sopheak available for emergency consultations?",
+     "Emergency consultations with Dr. Sopheak Rith: Available on-call 24/7."),
+    ("What is Dr. Sopheak's phone number?", "You can contact Dr. Sopheak Rith at 099-890-765."),
+    ("Which languages does Dr. Sopheak speak and what is his specialty?",
+     "Dr. Sopheak Rith speaks Khmer, English. "
+     "Dr. Sopheak Rith is our Chief Cardiologist, specializing in Interventional Cardiology."),
+    ("Which doctors work on Saturday?", "These doctors work on Saturday: Dr. Maria Santos (Senior Neurologist)."),
+    ("Who speaks German?", "These doctors speak German: Dr. Robert Williams (Chief Medical Officer)."),
+])
+def test_answers_simple_questions(directory, question, expected):
+    assert directory.answer(question)["answer"] == expected
+
+
+@pytest.mark.parametrize("question", [
+    # Mention a field keyword, but do not ask for the field
+    "How long has Dr. Sopheak worked here?",
+    "Where does Dr. Sopheak work?",
+    "Does Dr. Sopheak work with teenagers?",
+    "When did Dr. Maria Santos join the hospital?",
+    "Is Dr. Maria Santos open to new patients?",
+    "When is Dr. Maria Santos' Memory Disorders Clinic?",
+    # Qualifiers the table cannot answer
+    "Does Dr. Sopheak work on Monday?",
+    "Which doctors work on Saturday at 8 AM?",
+    "Which doctors do not speak Spanish?",
+    # A title is not a specialization
+    "What is Dr. Robert Williams' specialty?",
+    # Needs the LLM or a booking flow
+    "Should I book an appointment with Dr. Sopheak?",
+])
+def test_defers_to_the_llm(directory, question):
+    assert directory.answer(question) is None